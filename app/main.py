@@ -5,9 +5,14 @@ import asyncio
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .routers import summary
+from .routers import summary, feeds, stats, admin
 from .database import engine, Base
 from . import models
+from .services.feed_service import feed_scheduler
+from .services.prefetch_service import prefetcher
+from .services.profiling_service import ProfilingMiddleware
+from .services.scraper_service import close_scraper_client
+from .services.provider_clients import provider_clients
 
 # Load environment variables
 load_dotenv()
@@ -35,14 +40,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling (X-Profile-Token header or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
 # Create database tables on startup
 @app.on_event("startup")
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+# Start polling registered feeds once the tables exist
+@app.on_event("startup")
+async def start_feed_scheduler():
+    feed_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_feed_scheduler():
+    await feed_scheduler.stop()
+
+@app.on_event("startup")
+async def start_prefetcher():
+    prefetcher.start()
+
+@app.on_event("shutdown")
+async def stop_prefetcher():
+    await prefetcher.stop()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_scraper_client()
+    await provider_clients.close()
+
 # Include routers
 app.include_router(summary.router, prefix="/api")
+app.include_router(feeds.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -12,3 +12,74 @@ class Summary(Base):
     summary_content = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class Feed(Base):
+    __tablename__ = "feeds"
+    __table_args__ = (UniqueConstraint("wallet_address", "feed_url"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    wallet_address = Column(String, index=True)
+    feed_url = Column(String, nullable=False)
+    feed_type = Column(String)
+    poll_interval_seconds = Column(Integer, nullable=False)
+    etag = Column(String)
+    last_modified = Column(String)
+    last_seen_at = Column(DateTime(timezone=True))
+    last_polled_at = Column(DateTime(timezone=True))
+    next_poll_at = Column(DateTime(timezone=True), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class FeedSeenUrl(Base):
+    """Undated entries a feed has listed, so they are only summarized when they first appear"""
+    __tablename__ = "feed_seen_urls"
+    __table_args__ = (UniqueConstraint("feed_id", "url_hash"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    feed_id = Column(Integer, ForeignKey("feeds.id", ondelete="CASCADE"), nullable=False)
+    # SHA-256 of the URL, so long URLs do not bloat the unique index
+    url_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class UsageAggregate(Base):
+    """Running counters maintained on every summary insert, one row per (dimension, key)"""
+    __tablename__ = "usage_aggregates"
+    __table_args__ = (
+        UniqueConstraint("dimension", "key"),
+        Index("ix_usage_aggregates_dimension_count", "dimension", "count"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dimension = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
+    total_content_length = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class SummaryCacheEntry(Base):
+    """Summaries keyed by a hash of the normalized article text, provider, model and parameters"""
+    __tablename__ = "summary_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    provider = Column(String)
+    model = Column(String)
+    summary_content = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True))
+
+class ArticleFingerprint(Base):
+    """SimHash of the article behind a summary, split into indexed 16-bit bands for near-duplicate lookups"""
+    __tablename__ = "article_fingerprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    summary_id = Column(Integer, ForeignKey("summaries.id", ondelete="CASCADE"), index=True, nullable=False)
+    # What produced the summary; a lookup only reuses summaries of the current configuration
+    provider = Column(String)
+    model = Column(String)
+    cache_version = Column(String)
+    simhash = Column(BigInteger, nullable=False)
+    band0 = Column(Integer, index=True, nullable=False)
+    band1 = Column(Integer, index=True, nullable=False)
+    band2 = Column(Integer, index=True, nullable=False)
+    band3 = Column(Integer, index=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+import logging
+
+from ..schemas.feed import FeedSubscribeRequest, FeedUnsubscribeRequest, FeedResponse, FeedListResponse
+from ..services.web3_service import verify_signature
+from ..services.feed_repository import FeedRepository
+from ..services.feed_service import FEED_DEFAULT_POLL_INTERVAL, FEED_MIN_POLL_INTERVAL
+from ..database import get_db
+
+router = APIRouter(tags=["feeds"])
+logger = logging.getLogger(__name__)
+
+@router.post("/feeds", response_model=FeedResponse, status_code=status.HTTP_201_CREATED)
+async def subscribe_feed(
+    request: FeedSubscribeRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info(f"Feed subscription request for: {request.feed_url}")
+
+    is_valid = await verify_signature(request.wallet_address, request.signature)
+    if not is_valid:
+        logger.warning(f"Invalid signature from wallet: {request.wallet_address}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature"
+        )
+
+    poll_interval = request.poll_interval_seconds or FEED_DEFAULT_POLL_INTERVAL
+    if poll_interval < FEED_MIN_POLL_INTERVAL:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Poll interval must be at least {FEED_MIN_POLL_INTERVAL} seconds"
+        )
+
+    repository = FeedRepository(db)
+    if await repository.get_feed(request.wallet_address, str(request.feed_url)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Feed already registered for this wallet"
+        )
+
+    feed = await repository.create_feed(
+        wallet_address=request.wallet_address,
+        feed_url=str(request.feed_url),
+        poll_interval_seconds=poll_interval,
+        next_poll_at=datetime.now(timezone.utc)
+    )
+
+    logger.info(f"Feed registered with ID: {feed.id}")
+    return feed
+
+@router.get("/feeds/{wallet_address}", response_model=FeedListResponse)
+async def get_feeds_by_wallet(
+    wallet_address: str,
+    db: AsyncSession = Depends(get_db)
+):
+    logger.info(f"Fetching feeds for wallet: {wallet_address}")
+    repository = FeedRepository(db)
+    feeds = await repository.get_feeds_by_wallet(wallet_address)
+    return FeedListResponse(feeds=feeds)
+
+@router.delete("/feeds/{feed_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def unsubscribe_feed(
+    feed_id: int,
+    request: FeedUnsubscribeRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    is_valid = await verify_signature(request.wallet_address, request.signature)
+    if not is_valid:
+        logger.warning(f"Invalid signature from wallet: {request.wallet_address}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature"
+        )
+
+    repository = FeedRepository(db)
+    if not await repository.delete_feed(feed_id, request.wallet_address):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Feed not found"
+        )
+    logger.info(f"Feed {feed_id} removed for wallet: {request.wallet_address}")
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import List
+import logging
+
+from .. import models
+from ..schemas.stats import (
+    UsageAggregateResponse,
+    UsageStatsResponse,
+    WalletStatsResponse,
+    SummaryCacheStatsResponse,
+    PrefetchStatsResponse
+)
+from ..services.summary_cache import summary_cache
+from ..services.prefetch_service import prefetcher
+from ..services.summary_repository import (
+    SummaryRepository,
+    AGGREGATE_TOTAL,
+    AGGREGATE_WALLET,
+    AGGREGATE_DOMAIN,
+    AGGREGATE_DAY,
+    AGGREGATE_PROVIDER
+)
+from ..database import get_db
+
+router = APIRouter(tags=["stats"])
+logger = logging.getLogger(__name__)
+
+def _average(aggregate: models.UsageAggregate) -> float:
+    return aggregate.total_content_length / aggregate.count if aggregate.count else 0.0
+
+def _to_response(aggregates: List[models.UsageAggregate]) -> List[UsageAggregateResponse]:
+    return [
+        UsageAggregateResponse(key=a.key, count=a.count, average_content_length=_average(a))
+        for a in aggregates
+    ]
+
+@router.get("/stats", response_model=UsageStatsResponse)
+async def get_usage_stats(
+    top: int = Query(10, ge=1, le=100, description="Number of top wallets and domains to return"),
+    days: int = Query(30, ge=1, le=366, description="Number of recent days to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    repository = SummaryRepository(db)
+    total = await repository.get_usage_aggregate(AGGREGATE_TOTAL)
+
+    today = datetime.now(timezone.utc).date()
+    day_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(days)]
+
+    return UsageStatsResponse(
+        total_summaries=total.count if total else 0,
+        average_content_length=_average(total) if total else 0.0,
+        providers=_to_response(await repository.get_usage_aggregates(AGGREGATE_PROVIDER, limit=top)),
+        top_domains=_to_response(await repository.get_usage_aggregates(AGGREGATE_DOMAIN, limit=top)),
+        top_wallets=_to_response(await repository.get_usage_aggregates(AGGREGATE_WALLET, limit=top)),
+        days=_to_response(await repository.get_usage_aggregates(AGGREGATE_DAY, keys=day_keys))
+    )
+
+@router.get("/stats/wallets/{wallet_address}", response_model=WalletStatsResponse)
+async def get_wallet_stats(
+    wallet_address: str,
+    db: AsyncSession = Depends(get_db)
+):
+    repository = SummaryRepository(db)
+    aggregate = await repository.get_usage_aggregate(AGGREGATE_WALLET, wallet_address)
+    return WalletStatsResponse(
+        wallet_address=wallet_address,
+        total_summaries=aggregate.count if aggregate else 0,
+        average_content_length=_average(aggregate) if aggregate else 0.0
+    )
+
+@router.get("/stats/cache", response_model=SummaryCacheStatsResponse)
+async def get_summary_cache_stats():
+    return SummaryCacheStatsResponse(**summary_cache.stats())
+
+@router.get("/stats/prefetch", response_model=PrefetchStatsResponse)
+async def get_prefetch_stats():
+    return PrefetchStatsResponse(**prefetcher.stats())
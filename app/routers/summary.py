@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+import re
 
 from ..schemas.summary import SummarizeRequest, SummaryResponse, SummaryListResponse
 from ..services.web3_service import verify_signature
 from ..services.scraper_service import scrape_article
-from ..services.summarizer_service import summarizer
+from ..services.summarizer_service import summarizer, get_summary_tier, summary_is_reusable
+from ..services.deadline import Deadline
+from ..services.summary_cache import find_reusable_summary
+from ..services.prefetch_service import prefetcher
 from ..services.summary_repository import SummaryRepository
+from ..services.export_service import EXPORT_FORMATS, export_summaries, gzip_stream
 from ..database import get_db
 
 router = APIRouter(tags=["summaries"])
@@ -16,9 +22,13 @@ logger = logging.getLogger(__name__)
 @router.post("/summarize", response_model=SummaryResponse, status_code=status.HTTP_201_CREATED)
 async def summarize_article(
     request: SummarizeRequest,
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    x_request_timeout: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+    _foreground: None = Depends(prefetcher.foreground_request)
 ):
     logger.info(f"Summarize request received for article: {request.article_url}")
+    deadline = Deadline.from_header(x_request_timeout)
     
     is_valid = await verify_signature(request.wallet_address, request.signature)
     if not is_valid:
@@ -28,19 +38,46 @@ async def summarize_article(
             detail="Invalid signature"
         )
     
-    logger.info(f"Scraping article from URL: {request.article_url}")
-    article_content = await scrape_article(str(request.article_url))
+    article_content = prefetcher.take(str(request.article_url))
+    if article_content is not None:
+        logger.info(f"Using prefetched content for: {request.article_url}")
+    else:
+        logger.info(f"Scraping article from URL: {request.article_url}")
+        article_content = await scrape_article(str(request.article_url), deadline=deadline)
     
-    logger.info("Generating summary using AI service")
-    summary_content = await summarizer.summarize_text(article_content)
+    repository = SummaryRepository(db)
+    fingerprint = None
+    # Exact cache hits skip fingerprinting the article altogether
+    summary_content = await summarizer.get_cached_summary(article_content)
+    if summary_content is not None:
+        provider = summarizer.service_type
+        response.headers["X-Summary-Tier"] = get_summary_tier()
+    else:
+        summary_content, fingerprint = await find_reusable_summary(
+            repository, article_content, summarizer.service_type, summarizer.model_name
+        )
+        if summary_content is not None:
+            # Syndicated copies and light edits of an article already summarized
+            provider = "near_duplicate"
+            fingerprint = None
+            response.headers["X-Summary-Tier"] = "near_duplicate"
+        else:
+            logger.info(f"Generating summary using AI service ({deadline.remaining():.1f}s left)")
+            summary_content = await summarizer.summarize_text(article_content, deadline=deadline, check_cache=False)
+            provider = summarizer.service_type
+            response.headers["X-Summary-Tier"] = get_summary_tier()
+            if not summary_is_reusable():
+                # Degraded summaries must not be served to near-duplicates later
+                fingerprint = None
     
     logger.info("Storing summary in the database")
-    repository = SummaryRepository(db)
     summary = await repository.create_summary(
         wallet_address=request.wallet_address,
         article_url=str(request.article_url),
         original_content=article_content,
-        summary_content=summary_content
+        summary_content=summary_content,
+        provider=provider,
+        fingerprint=fingerprint
     )
     
     logger.info(f"Summary created with ID: {summary.id}")
@@ -57,3 +94,30 @@ async def get_summaries_by_wallet(
     
     logger.info(f"Retrieved {len(summaries)} summaries for wallet: {wallet_address}")
     return SummaryListResponse(summaries=summaries)
+
+@router.get("/summaries/{wallet_address}/export")
+async def export_summaries_by_wallet(
+    wallet_address: str,
+    format: str = Query("ndjson", description="Export format: ndjson or csv"),
+    include_content: bool = Query(False, description="Include the original article content"),
+    gzip: bool = Query(False, description="Compress the response with gzip")
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {format}"
+        )
+
+    logger.info(f"Exporting summaries for wallet: {wallet_address} as {format}")
+    body = export_summaries(wallet_address, format, include_content)
+    # The wallet address is an unvalidated path parameter; keep the header value a plain token
+    safe_wallet = re.sub(r"[^A-Za-z0-9_.-]", "_", wallet_address)
+    headers = {
+        "Content-Disposition": f'attachment; filename="summaries-{safe_wallet}.{format}"'
+    }
+    if gzip:
+        # Compression is chosen by the query parameter, which is already part of the cache key
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format], headers=headers)
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, HttpUrl
+from typing import Optional, List
+from datetime import datetime
+
+class FeedSubscribeRequest(BaseModel):
+    wallet_address: str
+    signature: str
+    feed_url: HttpUrl
+    poll_interval_seconds: Optional[int] = None
+
+class FeedUnsubscribeRequest(BaseModel):
+    wallet_address: str
+    signature: str
+
+class FeedResponse(BaseModel):
+    id: int
+    wallet_address: str
+    feed_url: str
+    feed_type: Optional[str] = None
+    poll_interval_seconds: int
+    last_seen_at: Optional[datetime] = None
+    last_polled_at: Optional[datetime] = None
+    next_poll_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
+
+class FeedListResponse(BaseModel):
+    feeds: List[FeedResponse]
@@ -0,0 +1,48 @@
+from pydantic import BaseModel
+from typing import List
+
+class UsageAggregateResponse(BaseModel):
+    key: str
+    count: int
+    average_content_length: float
+
+class UsageStatsResponse(BaseModel):
+    total_summaries: int
+    average_content_length: float
+    providers: List[UsageAggregateResponse]
+    top_domains: List[UsageAggregateResponse]
+    top_wallets: List[UsageAggregateResponse]
+    days: List[UsageAggregateResponse]
+
+class WalletStatsResponse(BaseModel):
+    wallet_address: str
+    total_summaries: int
+    average_content_length: float
+
+class SummaryCacheStatsResponse(BaseModel):
+    enabled: bool
+    version: str
+    memory_entries: int
+    memory_hits: int
+    database_hits: int
+    misses: int
+    stores: int
+    hit_rate: float
+
+class PrefetchStatsResponse(BaseModel):
+    enabled: bool
+    entries: int
+    lookups: int
+    hits: int
+    hit_rate: float
+    prefetched: int
+    used: int
+    precision: float
+    failed: int
+    wasted: int
+    wasted_cpu_seconds: float
+    wasted_summarizations: int
+    cpu_seconds: float
+    summarizations: int
+    skipped_busy: int
+    skipped_budget: int
@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class CPUMeter:
+    """Thread CPU seconds charged to one unit of background work"""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+
+# Meter of the work running in this context, None when nothing is measured.
+# asyncio tasks and asyncio.to_thread() copy the context, so the meter
+# follows the work onto the worker threads that run model inference.
+_cpu_meter: ContextVar[Optional[CPUMeter]] = ContextVar("cpu_meter", default=None)
+
+
+@contextmanager
+def measure_cpu() -> Iterator[CPUMeter]:
+    """
+    Collect the CPU time charged with charge_cpu() by the enclosed code
+
+    This is an approximation. Only the blocks wrapped in charge_cpu() (HTML
+    parsing, local model inference) count. Socket I/O, TLS and JSON decoding
+    are left out. In exchange, other requests sharing the event loop are
+    never billed, which process-wide CPU time would do.
+
+    Yields:
+        CPUMeter: The meter, whose ``seconds`` grows as charged blocks finish
+    """
+    meter = CPUMeter()
+    token = _cpu_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _cpu_meter.reset(token)
+
+
+@contextmanager
+def charge_cpu() -> Iterator[None]:
+    """Charge the thread CPU time of the enclosed synchronous block to the current meter, if any"""
+    meter = _cpu_meter.get()
+    if meter is None:
+        yield
+        return
+    started = time.thread_time()
+    try:
+        yield
+    finally:
+        meter.seconds += time.thread_time() - started
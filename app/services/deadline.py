@@ -0,0 +1,84 @@
+import os
+import time
+import asyncio
+import inspect
+import logging
+from typing import Awaitable, Optional, TypeVar
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Deadline configuration
+DEFAULT_REQUEST_DEADLINE = float(os.getenv("DEFAULT_REQUEST_DEADLINE", "30"))
+MAX_REQUEST_DEADLINE = float(os.getenv("MAX_REQUEST_DEADLINE", "300"))
+# Time kept back from every budget for storing the summary and sending the response
+DEADLINE_RESPONSE_RESERVE = float(os.getenv("DEADLINE_RESPONSE_RESERVE", "0.5"))
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self, stage: str):
+        super().__init__(
+            status_code=504,
+            detail=f"Deadline exceeded during {stage}; the remaining work was cancelled"
+        )
+        self.stage = stage
+
+
+class Deadline:
+    """
+    The point in time by which a request must be answered
+
+    Created once per request and passed down to each stage, which uses
+    remaining() to size its timeouts or pick a cheaper path.
+    """
+
+    def __init__(self, timeout: float):
+        self.budget = timeout
+        self.expires_at = time.monotonic() + timeout - DEADLINE_RESPONSE_RESERVE
+
+    @classmethod
+    def from_header(cls, value: Optional[str]) -> "Deadline":
+        """Build a deadline from the X-Request-Timeout header (seconds) or the default"""
+        timeout = DEFAULT_REQUEST_DEADLINE
+        if value:
+            try:
+                timeout = float(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid {DEADLINE_HEADER} header: {value}")
+            if timeout <= 0:
+                raise HTTPException(status_code=400, detail=f"{DEADLINE_HEADER} must be positive")
+        return cls(min(timeout, MAX_REQUEST_DEADLINE))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float) -> float:
+        """The timeout to use for a single operation: its usual cap, or less if the budget is shorter"""
+        return min(cap, self.remaining())
+
+    def check(self, stage: str):
+        if self.expired:
+            logger.warning(f"Deadline exceeded before {stage}")
+            raise DeadlineExceeded(stage)
+
+    async def run(self, awaitable: Awaitable[T], stage: str) -> T:
+        """Await within the remaining budget, cancelling the work when it runs out"""
+        if self.expired and inspect.iscoroutine(awaitable):
+            awaitable.close()
+        self.check(stage)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.remaining())
+        except asyncio.TimeoutError:
+            logger.warning(f"Cancelled {stage} after the deadline of {self.budget:.1f}s")
+            raise DeadlineExceeded(stage)
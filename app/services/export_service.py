@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import zlib
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List
+
+from ..database import SessionLocal
+from .summary_repository import SummaryRepository
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Rows are buffered into chunks of roughly this size before being sent
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FIELDS = ["id", "wallet_address", "article_url", "summary_content", "created_at"]
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _format_ndjson(row: dict, fields: List[str]) -> str:
+    return json.dumps({field: _serialize(row.get(field)) for field in fields}) + "\n"
+
+
+def _format_csv(row: dict, fields: List[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([_serialize(row.get(field)) for field in fields])
+    return buffer.getvalue()
+
+
+async def export_summaries(
+    wallet_address: str,
+    export_format: str,
+    include_content: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Stream a wallet's summaries as NDJSON or CSV
+
+    The generator opens its own database session because it keeps running
+    after the request handler has returned the StreamingResponse.
+
+    Args:
+        wallet_address: The wallet address to export
+        export_format: Either "ndjson" or "csv"
+        include_content: Whether to include the original article content
+
+    Yields:
+        bytes: Encoded chunks of the export
+    """
+    fields = EXPORT_FIELDS + (["original_content"] if include_content else [])
+    formatter = _format_csv if export_format == "csv" else _format_ndjson
+
+    chunk: List[str] = []
+    chunk_size = 0
+    if export_format == "csv":
+        header = _format_csv(dict(zip(fields, fields)), fields)
+        chunk.append(header)
+        chunk_size += len(header)
+
+    rows = 0
+    async with SessionLocal() as db:
+        repository = SummaryRepository(db)
+        async for row in repository.stream_summaries_by_wallet(wallet_address, include_content):
+            line = formatter(row, fields)
+            chunk.append(line)
+            chunk_size += len(line)
+            rows += 1
+            if chunk_size >= EXPORT_CHUNK_SIZE:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
+                chunk_size = 0
+
+    if chunk:
+        yield "".join(chunk).encode("utf-8")
+    logger.info(f"Exported {rows} summaries for wallet: {wallet_address}")
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member, chunk by chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,203 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from fastapi import Depends
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+import hashlib
+
+from .. import models
+from ..database import get_db
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+class FeedRepository:
+    def __init__(self, db: AsyncSession = Depends(get_db)):
+        self.db = db
+
+    async def create_feed(
+        self,
+        wallet_address: str,
+        feed_url: str,
+        poll_interval_seconds: int,
+        next_poll_at: datetime
+    ) -> models.Feed:
+        """
+        Register a feed subscription for a wallet
+
+        Args:
+            wallet_address: The wallet address of the subscriber
+            feed_url: The RSS/Atom feed or sitemap URL
+            poll_interval_seconds: How often the feed should be polled
+            next_poll_at: When the feed is first due for polling
+
+        Returns:
+            models.Feed: The created feed object
+        """
+        db_feed = models.Feed(
+            wallet_address=wallet_address,
+            feed_url=feed_url,
+            poll_interval_seconds=poll_interval_seconds,
+            next_poll_at=next_poll_at
+        )
+        self.db.add(db_feed)
+        await self.db.commit()
+        await self.db.refresh(db_feed)
+        return db_feed
+
+    async def get_feed(self, wallet_address: str, feed_url: str) -> Optional[models.Feed]:
+        """
+        Get a wallet's subscription to a specific feed URL
+
+        Args:
+            wallet_address: The wallet address of the subscriber
+            feed_url: The feed URL
+
+        Returns:
+            Optional[models.Feed]: The feed object if found, None otherwise
+        """
+        query = select(models.Feed).where(
+            models.Feed.wallet_address == wallet_address,
+            models.Feed.feed_url == feed_url
+        )
+        result = await self.db.execute(query)
+        return result.scalars().first()
+
+    async def get_feeds_by_wallet(self, wallet_address: str) -> List[models.Feed]:
+        """
+        Get all feed subscriptions for a specific wallet address
+
+        Args:
+            wallet_address: The wallet address to filter by
+
+        Returns:
+            List[models.Feed]: List of feed objects
+        """
+        query = select(models.Feed).where(
+            models.Feed.wallet_address == wallet_address
+        ).order_by(models.Feed.id)
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_due_feeds(self, now: datetime, limit: int) -> List[models.Feed]:
+        """
+        Get feeds whose next poll time has passed, oldest first
+
+        Args:
+            now: The current time
+            limit: Maximum number of feeds to return
+
+        Returns:
+            List[models.Feed]: List of feed objects that are due for polling
+        """
+        query = select(models.Feed).where(
+            models.Feed.next_poll_at <= now
+        ).order_by(models.Feed.next_poll_at).limit(limit)
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def delete_feed(self, feed_id: int, wallet_address: str) -> bool:
+        """
+        Delete a wallet's feed subscription
+
+        Args:
+            feed_id: The ID of the feed to delete
+            wallet_address: The wallet address that owns the feed
+
+        Returns:
+            bool: True if a feed was deleted, False otherwise
+        """
+        query = delete(models.Feed).where(
+            models.Feed.id == feed_id,
+            models.Feed.wallet_address == wallet_address
+        )
+        result = await self.db.execute(query)
+        if result.rowcount > 0:
+            # SQLite does not enforce ON DELETE CASCADE unless foreign keys are enabled
+            await self.db.execute(delete(models.FeedSeenUrl).where(models.FeedSeenUrl.feed_id == feed_id))
+        await self.db.commit()
+        return result.rowcount > 0
+
+    async def get_known_urls(self, wallet_address: str, urls: Iterable[str]) -> Set[str]:
+        """
+        Return the subset of the given URLs that already have a summary for the wallet
+
+        Args:
+            wallet_address: The wallet address to filter by
+            urls: Candidate article URLs
+
+        Returns:
+            Set[str]: URLs already stored in the summaries table
+        """
+        urls = list(urls)
+        known: Set[str] = set()
+        # Sitemaps can list tens of thousands of URLs; stay under bind parameter limits
+        for start in range(0, len(urls), 500):
+            query = select(models.Summary.article_url).where(
+                models.Summary.wallet_address == wallet_address,
+                models.Summary.article_url.in_(urls[start:start + 500])
+            )
+            result = await self.db.execute(query)
+            known.update(result.scalars().all())
+        return known
+
+    async def get_seen_urls(self, feed_id: int, urls: Iterable[str]) -> Set[str]:
+        """
+        Return the subset of the given URLs that the feed has listed before
+
+        Args:
+            feed_id: The ID of the feed
+            urls: Undated entry URLs from the current document
+
+        Returns:
+            Set[str]: URLs already recorded with mark_urls_seen()
+        """
+        by_hash = {url_hash(url): url for url in urls}
+        hashes = list(by_hash)
+        seen: Set[str] = set()
+        for start in range(0, len(hashes), 500):
+            query = select(models.FeedSeenUrl.url_hash).where(
+                models.FeedSeenUrl.feed_id == feed_id,
+                models.FeedSeenUrl.url_hash.in_(hashes[start:start + 500])
+            )
+            result = await self.db.execute(query)
+            seen.update(by_hash[value] for value in result.scalars().all())
+        return seen
+
+    async def mark_urls_seen(self, feed_id: int, urls: Iterable[str]) -> None:
+        """
+        Record undated entry URLs as seen; committed with the next save()
+
+        Args:
+            feed_id: The ID of the feed
+            urls: Undated entry URLs that need no further work
+        """
+        rows = [{"feed_id": feed_id, "url_hash": url_hash(url)} for url in set(urls)]
+        if not rows:
+            return
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            for start in range(0, len(rows), 500):
+                # An overlapping poll of the same feed may have recorded them already
+                statement = insert(models.FeedSeenUrl).values(rows[start:start + 500])
+                await self.db.execute(statement.on_conflict_do_nothing(index_elements=["feed_id", "url_hash"]))
+        else:
+            self.db.add_all(models.FeedSeenUrl(**row) for row in rows)
+
+    async def save(self, feed: models.Feed) -> models.Feed:
+        """
+        Persist changes made to a feed object
+
+        Args:
+            feed: The feed object to save
+
+        Returns:
+            models.Feed: The saved feed object
+        """
+        self.db.add(feed)
+        await self.db.commit()
+        return feed
@@ -0,0 +1,385 @@
+import os
+import asyncio
+import logging
+import httpx
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Collection, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+from .. import models
+from ..database import SessionLocal
+from .feed_repository import FeedRepository
+from .summary_repository import SummaryRepository
+from .scraper_service import _get_client, host_scheduler, scrape_article
+from .summarizer_service import summarizer, summary_is_reusable
+from .summary_cache import find_reusable_summary
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Feed scheduler configuration
+FEED_SCHEDULER_ENABLED = os.getenv("FEED_SCHEDULER_ENABLED", "true").lower() == "true"
+FEED_SCHEDULER_TICK_SECONDS = float(os.getenv("FEED_SCHEDULER_TICK_SECONDS", "30"))
+FEED_DEFAULT_POLL_INTERVAL = int(os.getenv("FEED_DEFAULT_POLL_INTERVAL", "900"))
+FEED_MIN_POLL_INTERVAL = int(os.getenv("FEED_MIN_POLL_INTERVAL", "60"))
+FEED_MAX_FEEDS_PER_TICK = int(os.getenv("FEED_MAX_FEEDS_PER_TICK", "20"))
+FEED_POLL_CONCURRENCY = int(os.getenv("FEED_POLL_CONCURRENCY", "4"))
+FEED_MAX_ITEMS_PER_POLL = int(os.getenv("FEED_MAX_ITEMS_PER_POLL", "25"))
+FEED_INITIAL_ITEMS = int(os.getenv("FEED_INITIAL_ITEMS", "10"))
+FEED_MAX_CHILD_SITEMAPS = int(os.getenv("FEED_MAX_CHILD_SITEMAPS", "5"))
+FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "30"))
+
+USER_AGENT = "Mozilla/5.0 (compatible; Web3ArticleSummarizer/1.0; +feed-poller)"
+
+
+class FeedEntry(NamedTuple):
+    url: str
+    published: Optional[datetime]
+
+
+class ParsedFeed(NamedTuple):
+    feed_type: str
+    entries: List[FeedEntry]
+    sitemaps: List[FeedEntry]
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> Optional[str]:
+    for child in element:
+        if _local_name(child.tag) == name and child.text:
+            return child.text.strip()
+    return None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse RFC 822 (RSS) or ISO 8601 (Atom, sitemaps) dates"""
+    if not value:
+        return None
+    try:
+        return _as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return _as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    except ValueError:
+        logger.debug(f"Unparseable feed date: {value}")
+        return None
+
+
+def parse_feed(document: str) -> ParsedFeed:
+    """
+    Parse an RSS 2.0, Atom or sitemap document into article entries
+
+    Args:
+        document: The raw XML document
+
+    Returns:
+        ParsedFeed: The detected feed type, article entries and, for sitemap
+        indexes, the child sitemaps to follow
+    """
+    root = ET.fromstring(document)
+    root_name = _local_name(root.tag)
+    entries: List[FeedEntry] = []
+    sitemaps: List[FeedEntry] = []
+
+    if root_name in ("rss", "RDF"):
+        for item in root.iter():
+            if _local_name(item.tag) != "item":
+                continue
+            link = _child_text(item, "link") or _child_text(item, "guid")
+            if link:
+                published = _child_text(item, "pubDate") or _child_text(item, "date")
+                entries.append(FeedEntry(link, _parse_date(published)))
+        return ParsedFeed("rss", entries, sitemaps)
+
+    if root_name == "feed":
+        for entry in root:
+            if _local_name(entry.tag) != "entry":
+                continue
+            link = None
+            for child in entry:
+                if _local_name(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+                    link = child.get("href")
+                    break
+            if link:
+                published = _child_text(entry, "updated") or _child_text(entry, "published")
+                entries.append(FeedEntry(link, _parse_date(published)))
+        return ParsedFeed("atom", entries, sitemaps)
+
+    if root_name in ("urlset", "sitemapindex"):
+        target = entries if root_name == "urlset" else sitemaps
+        for node in root:
+            loc = _child_text(node, "loc")
+            if loc:
+                target.append(FeedEntry(loc, _parse_date(_child_text(node, "lastmod"))))
+        return ParsedFeed("sitemap", entries, sitemaps)
+
+    raise ValueError(f"Unsupported feed document root: {root_name}")
+
+
+def select_new_entries(
+    entries: List[FeedEntry],
+    watermark: Optional[datetime],
+    limit: int,
+    known: Collection[str] = frozenset(),
+    seen: Collection[str] = frozenset()
+) -> List[FeedEntry]:
+    """
+    Pick the entries that are newer than the watermark and not yet known, oldest first
+
+    Known URLs are dropped before the limit is applied, so already-summarized
+    items can never crowd out new ones. Dated entries are ordered by date.
+    Entries without a date cannot be compared against the watermark: only
+    those not ``seen`` on an earlier poll are new. They follow the dated
+    ones, and since feeds list their newest items first, their position in
+    the document stands in for their age. On the first poll (no watermark
+    and nothing seen) only the newest FEED_INITIAL_ITEMS entries are taken
+    so subscribing to a large archive stays cheap.
+    """
+    unique = {}
+    for position, entry in enumerate(entries):
+        if entry.url not in unique and entry.url not in known and entry.url not in seen:
+            unique[entry.url] = (position, entry)
+
+    dated = sorted((e for _, e in unique.values() if e.published is not None), key=lambda e: e.published)
+    undated = [
+        e for _, e in sorted(
+            (item for item in unique.values() if item[1].published is None),
+            key=lambda item: item[0], reverse=True
+        )
+    ]
+    ordered = dated + undated
+
+    if watermark is None and not seen:
+        return ordered[-min(limit, FEED_INITIAL_ITEMS):] if ordered else []
+
+    fresh = [e for e in ordered if e.published is None or watermark is None or e.published > watermark]
+    return fresh[:limit]
+
+
+async def _fetch(url: str, headers: Dict[str, str]) -> httpx.Response:
+    """GET a feed document with the scraper's pooled client and per-host limits"""
+    async with host_scheduler.slot((urlsplit(url).hostname or "").lower()):
+        return await _get_client().get(url, headers=headers, timeout=FEED_FETCH_TIMEOUT)
+
+
+class FeedScheduler:
+    """Polls registered feeds and summarizes entries that have not been seen yet"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._semaphore = asyncio.Semaphore(FEED_POLL_CONCURRENCY)
+
+    def start(self):
+        if not FEED_SCHEDULER_ENABLED:
+            logger.info("Feed scheduler disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Feed scheduler started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Feed scheduler stopped")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Feed scheduler tick failed: {str(e)}")
+            await asyncio.sleep(FEED_SCHEDULER_TICK_SECONDS)
+
+    async def run_once(self) -> int:
+        """Poll every feed that is currently due; returns the number of feeds polled"""
+        async with SessionLocal() as db:
+            feeds = await FeedRepository(db).get_due_feeds(
+                datetime.now(timezone.utc), FEED_MAX_FEEDS_PER_TICK
+            )
+            feed_ids = [feed.id for feed in feeds]
+
+        await asyncio.gather(*(self._poll_with_limit(feed_id) for feed_id in feed_ids))
+        return len(feed_ids)
+
+    async def _poll_with_limit(self, feed_id: int):
+        async with self._semaphore:
+            try:
+                async with SessionLocal() as db:
+                    feed = await db.get(models.Feed, feed_id)
+                    if feed is not None:
+                        await self.poll_feed(db, feed)
+            except Exception as e:
+                logger.error(f"Polling feed {feed_id} failed: {str(e)}")
+
+    async def poll_feed(self, db, feed: models.Feed) -> int:
+        """
+        Poll a single feed with a conditional GET and summarize its new entries
+
+        Args:
+            db: The database session
+            feed: The feed to poll
+
+        Returns:
+            int: The number of summaries created
+        """
+        repository = FeedRepository(db)
+        now = datetime.now(timezone.utc)
+        feed.last_polled_at = now
+        feed.next_poll_at = now + timedelta(seconds=feed.poll_interval_seconds)
+
+        headers = {"User-Agent": USER_AGENT}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+
+        try:
+            response = await _fetch(feed.feed_url, headers)
+            if response.status_code == 304:
+                logger.info(f"Feed {feed.feed_url} not modified")
+                await repository.save(feed)
+                return 0
+            response.raise_for_status()
+            parsed = parse_feed(response.text)
+
+            entries = list(parsed.entries)
+            entries.extend(await self._fetch_child_sitemaps(parsed.sitemaps, feed))
+        except (httpx.HTTPError, ET.ParseError, ValueError) as e:
+            logger.error(f"Failed to fetch feed {feed.feed_url}: {str(e)}")
+            await repository.save(feed)
+            return 0
+
+        feed.feed_type = parsed.feed_type
+
+        watermark = _as_utc(feed.last_seen_at)
+        pending = [e for e in entries if watermark is None or e.published is None or e.published > watermark]
+        known = await repository.get_known_urls(feed.wallet_address, {e.url for e in pending})
+        undated = {e.url for e in entries if e.published is None}
+        seen = await repository.get_seen_urls(feed.id, undated)
+        initial = watermark is None and not seen
+        new_entries = select_new_entries(entries, watermark, FEED_MAX_ITEMS_PER_POLL, known, seen)
+        logger.info(
+            f"Feed {feed.feed_url}: {len(entries)} entries, "
+            f"{len(pending)} past watermark, {len(new_entries)} new selected"
+        )
+
+        # The watermark may only move up to the first dated entry that still
+        # needs work: one that failed, or a new one left over by the limit
+        cutoff = None
+        left_over = []
+        if not initial:
+            selected = {e.url for e in new_entries}
+            left_over = [e for e in pending if e.url not in known and e.url not in seen and e.url not in selected]
+            cutoff = min((e.published for e in left_over if e.published is not None), default=None)
+
+        created = 0
+        failed = []
+        handled = [e.published for e in pending if e.url in known and e.published is not None]
+        for entry in new_entries:
+            if await self._summarize_entry(db, feed, entry):
+                created += 1
+                if entry.published is not None:
+                    handled.append(entry.published)
+            else:
+                failed.append(entry.url)
+                if entry.published is not None and (cutoff is None or entry.published < cutoff):
+                    cutoff = entry.published
+
+        handled = [p for p in handled if cutoff is None or p < cutoff]
+        if handled:
+            watermark = max(handled) if watermark is None else max(watermark, *handled)
+
+        feed.last_seen_at = watermark
+        # Undated entries skipped by the initial window count as seen; those
+        # left over by the limit or failed stay new for the next poll
+        pending_urls = set(failed) | {e.url for e in left_over}
+        await repository.mark_urls_seen(feed.id, undated - seen - pending_urls)
+        # A 304 on the next poll would hide work still pending in this version
+        # of the document, so only keep the validators once all of it is done
+        if left_over or failed:
+            feed.etag = feed.last_modified = None
+        else:
+            feed.etag = response.headers.get("ETag")
+            feed.last_modified = response.headers.get("Last-Modified")
+        await repository.save(feed)
+        return created
+
+    async def _fetch_child_sitemaps(
+        self,
+        sitemaps: List[FeedEntry],
+        feed: models.Feed
+    ) -> List[FeedEntry]:
+        """Follow child sitemaps of a sitemap index that changed since the watermark"""
+        watermark = _as_utc(feed.last_seen_at)
+        changed = [
+            s for s in sitemaps
+            if watermark is None or s.published is None or s.published > watermark
+        ]
+        changed.sort(key=lambda s: s.published or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+
+        entries: List[FeedEntry] = []
+        for sitemap in changed[:FEED_MAX_CHILD_SITEMAPS]:
+            try:
+                response = await _fetch(sitemap.url, {"User-Agent": USER_AGENT})
+                response.raise_for_status()
+                entries.extend(parse_feed(response.text).entries)
+            except (httpx.HTTPError, ET.ParseError, ValueError) as e:
+                logger.warning(f"Skipping child sitemap {sitemap.url}: {str(e)}")
+        return entries
+
+    async def _summarize_entry(self, db, feed: models.Feed, entry: FeedEntry) -> bool:
+        try:
+            article_content = await scrape_article(entry.url)
+            repository = SummaryRepository(db)
+            fingerprint = None
+            summary_content = await summarizer.get_cached_summary(article_content)
+            if summary_content is not None:
+                provider = summarizer.service_type
+            else:
+                summary_content, fingerprint = await find_reusable_summary(
+                    repository, article_content, summarizer.service_type, summarizer.model_name
+                )
+                if summary_content is not None:
+                    provider, fingerprint = "near_duplicate", None
+                else:
+                    summary_content = await summarizer.summarize_text(article_content, check_cache=False)
+                    provider = summarizer.service_type
+                    if not summary_is_reusable():
+                        fingerprint = None
+            await repository.create_summary(
+                wallet_address=feed.wallet_address,
+                article_url=entry.url,
+                original_content=article_content,
+                summary_content=summary_content,
+                provider=provider,
+                fingerprint=fingerprint
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to summarize feed entry {entry.url}: {str(e)}")
+            return False
+
+
+# Create a singleton instance
+feed_scheduler = FeedScheduler()
@@ -0,0 +1,72 @@
+import os
+import re
+import hashlib
+import unicodedata
+from typing import List
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Near-duplicate detection configuration
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+NEAR_DUPLICATE_MIN_LENGTH = int(os.getenv("NEAR_DUPLICATE_MIN_LENGTH", "300"))
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 2
+# The 64-bit fingerprint is split into 4 bands of 16 bits. Two fingerprints
+# within Hamming distance 3 must agree exactly on at least one band, so the
+# lookup only needs indexed equality matches on the bands.
+BAND_COUNT = 4
+BAND_BITS = SIMHASH_BITS // BAND_COUNT
+MAX_SUPPORTED_DISTANCE = BAND_COUNT - 1
+
+NEAR_DUPLICATE_MAX_DISTANCE = min(
+    int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "3")), MAX_SUPPORTED_DISTANCE
+)
+
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text: str) -> int:
+    """
+    Compute the 64-bit SimHash of a text over word bigrams
+
+    Args:
+        text: The article text
+
+    Returns:
+        int: The unsigned 64-bit fingerprint
+    """
+    words = _WORD.findall(unicodedata.normalize("NFKC", text).lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    # One row of 64 bits per shingle, most significant bit first; a bit of the
+    # fingerprint is set when it is set in more than half of the shingle hashes
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, SIMHASH_BITS // 8), axis=1)
+    majority = 2 * bits.sum(axis=0, dtype=np.int64) > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << SIMHASH_BITS) - 1)).count("1")
+
+
+def bands(fingerprint: int) -> List[int]:
+    """Split a fingerprint into BAND_COUNT integers of BAND_BITS bits"""
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(BAND_COUNT)]
+
+
+def to_signed(fingerprint: int) -> int:
+    """Map an unsigned 64-bit fingerprint onto a signed BIGINT column"""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
@@ -0,0 +1,124 @@
+import os
+import logging
+import functools
+from typing import Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# ONNX Runtime configuration
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx_models")
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 lets ONNX Runtime decide
+ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", "1"))
+# Dynamic quantization preset: avx2, avx512, avx512_vnni or arm64
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx2")
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    try:
+        from optimum.onnxruntime import pipeline as ort_pipeline
+    except ImportError:
+        # optimum 1.x ships the ONNX Runtime pipeline factory in optimum.pipelines
+        from optimum.pipelines import pipeline as _optimum_pipeline
+        ort_pipeline = functools.partial(_optimum_pipeline, accelerator="ort")
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+QUANTIZED_SUFFIX = "_quantized"
+
+
+def _model_dir(model_name: str) -> str:
+    return os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "--"))
+
+
+def export_quantized_model(model_name: str) -> str:
+    """
+    Export a seq2seq model to ONNX and quantize its weights to int8
+
+    The export is done once and reused from ONNX_MODEL_DIR on later starts.
+
+    Args:
+        model_name: The HuggingFace model name, e.g. facebook/bart-large-cnn
+
+    Returns:
+        str: The directory holding the quantized model, config and tokenizer
+    """
+    from transformers import AutoTokenizer
+
+    base_dir = _model_dir(model_name)
+    fp32_dir = os.path.join(base_dir, "fp32")
+    int8_dir = os.path.join(base_dir, "int8")
+    if os.path.isdir(int8_dir) and any(f.endswith(f"{QUANTIZED_SUFFIX}.onnx") for f in os.listdir(int8_dir)):
+        return int8_dir
+
+    logger.info(f"Exporting {model_name} to ONNX (one-off, this can take a few minutes)")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(fp32_dir)
+
+    quantization_config = getattr(AutoQuantizationConfig, ONNX_QUANTIZATION)(is_static=False, per_channel=False)
+    for file_name in sorted(os.listdir(fp32_dir)):
+        if file_name.endswith(".onnx"):
+            logger.info(f"Quantizing {file_name} to int8 ({ONNX_QUANTIZATION})")
+            quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name=file_name)
+            quantizer.quantize(save_dir=int8_dir, quantization_config=quantization_config)
+
+    model.config.save_pretrained(int8_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(int8_dir)
+    return int8_dir
+
+
+def _session_options() -> "onnxruntime.SessionOptions":
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = ONNX_INTER_OP_THREADS
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def _quantized_file_names(model_dir: str) -> Dict[str, str]:
+    names = {}
+    for role in ("encoder", "decoder", "decoder_with_past"):
+        file_name = f"{role}_model{QUANTIZED_SUFFIX}.onnx"
+        if os.path.exists(os.path.join(model_dir, file_name)):
+            names[f"{role}_file_name"] = file_name
+    return names
+
+
+def create_onnx_pipeline(model_name: str):
+    """
+    Build a transformers summarization pipeline backed by an int8 ONNX Runtime model
+
+    The returned object is called exactly like pipeline("summarization").
+    It is built with optimum's pipeline factory: transformers.pipeline does
+    not know how to load an ORTModel on its own.
+
+    Args:
+        model_name: The HuggingFace model name to export and quantize
+
+    Returns:
+        A summarization pipeline running on CPUExecutionProvider
+    """
+    if not ONNX_AVAILABLE:
+        raise RuntimeError("ONNX backend requires optional dependencies: pip install optimum[onnxruntime]")
+
+    from transformers import AutoTokenizer
+
+    model_dir = export_quantized_model(model_name)
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        provider="CPUExecutionProvider",
+        session_options=_session_options(),
+        **_quantized_file_names(model_dir)
+    )
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    logger.info(
+        f"Loaded int8 ONNX model for {model_name} "
+        f"(intra-op threads: {ONNX_INTRA_OP_THREADS or 'auto'}, inter-op threads: {ONNX_INTER_OP_THREADS})"
+    )
+    return ort_pipeline("summarization", model=model, tokenizer=tokenizer)
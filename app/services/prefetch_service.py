@@ -0,0 +1,366 @@
+import os
+import time
+import asyncio
+import logging
+import httpx
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+from ..database import SessionLocal
+from .summary_repository import SummaryRepository, article_domain
+from .feed_service import FeedEntry, parse_feed
+from .scraper_service import USER_AGENT, _get_client, host_scheduler, robots_cache, scrape_article
+from .cpu_accounting import measure_cpu
+from .summarizer_service import summarizer, get_summary_tier, summary_is_reusable
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Prefetch configuration
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+PREFETCH_INTERVAL_SECONDS = float(os.getenv("PREFETCH_INTERVAL_SECONDS", "60"))
+PREFETCH_HISTORY_ROWS = int(os.getenv("PREFETCH_HISTORY_ROWS", "5000"))
+PREFETCH_HALF_LIFE_SECONDS = float(os.getenv("PREFETCH_HALF_LIFE_SECONDS", "3600"))
+PREFETCH_MIN_URL_SCORE = float(os.getenv("PREFETCH_MIN_URL_SCORE", "2"))
+PREFETCH_MIN_DOMAIN_SCORE = float(os.getenv("PREFETCH_MIN_DOMAIN_SCORE", "5"))
+PREFETCH_TOP_DOMAINS = int(os.getenv("PREFETCH_TOP_DOMAINS", "3"))
+PREFETCH_URLS_PER_DOMAIN = int(os.getenv("PREFETCH_URLS_PER_DOMAIN", "3"))
+PREFETCH_MAX_ARTICLE_AGE = float(os.getenv("PREFETCH_MAX_ARTICLE_AGE", "21600"))
+PREFETCH_DISCOVERY_INTERVAL = float(os.getenv("PREFETCH_DISCOVERY_INTERVAL", "600"))
+PREFETCH_MAX_ITEMS_PER_CYCLE = int(os.getenv("PREFETCH_MAX_ITEMS_PER_CYCLE", "10"))
+PREFETCH_MAX_ENTRIES = int(os.getenv("PREFETCH_MAX_ENTRIES", "200"))
+PREFETCH_CONTENT_TTL = float(os.getenv("PREFETCH_CONTENT_TTL", "900"))
+# Budgets: share of one core the prefetcher may keep busy, measured as the
+# thread CPU time of its HTML parsing and local inference (approximate, see
+# cpu_accounting), and summarizer calls (API requests or model runs) per rolling hour
+PREFETCH_CPU_BUDGET = float(os.getenv("PREFETCH_CPU_BUDGET", "0.1"))
+PREFETCH_MAX_SUMMARIES_PER_HOUR = int(os.getenv("PREFETCH_MAX_SUMMARIES_PER_HOUR", "30"))
+# Prefetch only while at most this many /summarize requests are in flight
+PREFETCH_IDLE_MAX_INFLIGHT = int(os.getenv("PREFETCH_IDLE_MAX_INFLIGHT", "0"))
+
+
+def score_history(
+    rows: List[Tuple[str, Optional[datetime]]],
+    now: datetime,
+    half_life: float = PREFETCH_HALF_LIFE_SECONDS
+) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Score URLs and domains by exponentially decayed request counts
+
+    A request made ``half_life`` seconds ago counts half as much as one made
+    now, so scores follow what is trending rather than what is popular overall.
+
+    Args:
+        rows: (article_url, created_at) pairs from the summaries table
+        now: The reference time
+        half_life: Decay half-life in seconds
+
+    Returns:
+        Tuple[Dict[str, float], Dict[str, float]]: URL scores and domain scores
+    """
+    url_scores: Dict[str, float] = {}
+    domain_scores: Dict[str, float] = {}
+    for url, created_at in rows:
+        if created_at is None:
+            continue
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age = max(0.0, (now - created_at).total_seconds())
+        weight = 0.5 ** (age / half_life)
+        url_scores[url] = url_scores.get(url, 0.0) + weight
+        domain = article_domain(url)
+        domain_scores[domain] = domain_scores.get(domain, 0.0) + weight
+    return url_scores, domain_scores
+
+
+class PrefetchedArticle:
+    """Scraped text of a prefetched URL and what it cost to produce"""
+
+    def __init__(self, content: str, cpu_seconds: float, summarizations: int):
+        self.content = content
+        self.fetched_at = time.monotonic()
+        self.cpu_seconds = cpu_seconds
+        self.summarizations = summarizations
+        self.served = 0
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self.fetched_at > PREFETCH_CONTENT_TTL
+
+
+class Prefetcher:
+    """
+    Speculatively scrapes and summarizes URLs that are likely to be requested
+
+    Candidates are URLs with a high decayed request count in recent history,
+    plus the newest sitemap entries of the hottest domains. Summaries go into
+    the summary cache; the scraped text is kept for PREFETCH_CONTENT_TTL
+    seconds so /summarize can skip scraping as well. Work only runs while the
+    service is idle and within the CPU and summarization budgets.
+    """
+
+    def __init__(self):
+        self.enabled = PREFETCH_ENABLED
+        self.in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+        self._articles: "OrderedDict[str, PrefetchedArticle]" = OrderedDict()
+        self._summarizations: Deque[float] = deque()
+        self._discovered: Dict[str, Tuple[List[str], float]] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._next_work_at = 0.0
+        self.lookups = 0
+        self.hits = 0
+        self.prefetched = 0
+        self.used = 0
+        self.failed = 0
+        self.wasted = 0
+        self.wasted_cpu_seconds = 0.0
+        self.wasted_summarizations = 0
+        self.cpu_seconds = 0.0
+        self.summarization_count = 0
+        self.skipped_busy = 0
+        self.skipped_budget = 0
+
+    def start(self):
+        if not self.enabled:
+            logger.info("Prefetcher disabled")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Prefetcher started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Prefetcher stopped")
+
+    async def foreground_request(self):
+        """Dependency marking a /summarize request as in flight, so prefetching yields to it"""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def take(self, url: str) -> Optional[str]:
+        """Return the prefetched text of a URL, or None if it was not prefetched"""
+        if not self.enabled:
+            return None
+
+        self.lookups += 1
+        article = self._articles.get(url)
+        if article is None:
+            return None
+        if article.expired:
+            self._discard(url)
+            return None
+
+        if article.served == 0:
+            self.used += 1
+        article.served += 1
+        self.hits += 1
+        return article.content
+
+    def _discard(self, url: str):
+        article = self._articles.pop(url)
+        if article.served == 0:
+            self._record_waste(article.cpu_seconds, article.summarizations)
+
+    def _record_waste(self, cpu_seconds: float, summarizations: int):
+        self.wasted += 1
+        self.wasted_cpu_seconds += cpu_seconds
+        self.wasted_summarizations += summarizations
+
+    def _prune(self):
+        for url in [url for url, article in self._articles.items() if article.expired]:
+            self._discard(url)
+        now = time.monotonic()
+        self._failed_until = {url: until for url, until in self._failed_until.items() if until > now}
+
+    def _is_idle(self) -> bool:
+        return self.in_flight <= PREFETCH_IDLE_MAX_INFLIGHT
+
+    def _summarization_budget_left(self) -> bool:
+        cutoff = time.monotonic() - 3600
+        while self._summarizations and self._summarizations[0] < cutoff:
+            self._summarizations.popleft()
+        return len(self._summarizations) < PREFETCH_MAX_SUMMARIES_PER_HOUR
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Prefetch cycle failed: {str(e)}")
+            await asyncio.sleep(PREFETCH_INTERVAL_SECONDS)
+
+    async def run_once(self) -> int:
+        """Prefetch the current candidates within budget; returns the number prefetched"""
+        self._prune()
+        if not self._is_idle():
+            self.skipped_busy += 1
+            return 0
+
+        async with SessionLocal() as db:
+            rows = await SummaryRepository(db).get_recent_requests(PREFETCH_HISTORY_ROWS)
+        url_scores, domain_scores = score_history(rows, datetime.now(timezone.utc))
+
+        candidates = await self._candidates(url_scores, domain_scores)
+        done = 0
+        for url in candidates[:PREFETCH_MAX_ITEMS_PER_CYCLE]:
+            if not self._is_idle():
+                self.skipped_busy += 1
+                break
+            if not self._summarization_budget_left():
+                self.skipped_budget += 1
+                break
+            # Stay under the CPU budget: after an item that used c seconds of
+            # CPU, pause long enough that c is at most PREFETCH_CPU_BUDGET of the elapsed time
+            pause = self._next_work_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if await self.prefetch(url):
+                done += 1
+        return done
+
+    async def _candidates(self, url_scores: Dict[str, float], domain_scores: Dict[str, float]) -> List[str]:
+        """Trending URLs first, then fresh URLs from hot domains, skipping ones already prefetched"""
+        ranked = sorted(
+            (url for url, score in url_scores.items() if score >= PREFETCH_MIN_URL_SCORE),
+            key=url_scores.get, reverse=True
+        )
+        hot_domains = sorted(
+            (domain for domain, score in domain_scores.items() if domain and score >= PREFETCH_MIN_DOMAIN_SCORE),
+            key=domain_scores.get, reverse=True
+        )[:PREFETCH_TOP_DOMAINS]
+        origins = {}
+        for url in url_scores:
+            parts = urlsplit(url)
+            origins.setdefault(article_domain(url), f"{parts.scheme}://{parts.netloc}")
+        for domain in hot_domains:
+            ranked.extend(url for url in await self._discover(domain, origins[domain]) if url not in url_scores)
+
+        now = time.monotonic()
+        return [
+            url for url in dict.fromkeys(ranked)
+            if url not in self._articles and self._failed_until.get(url, 0.0) <= now
+        ]
+
+    async def _discover(self, domain: str, origin: str) -> List[str]:
+        """Newest article URLs of a domain from the sitemaps listed in its robots.txt"""
+        cached = self._discovered.get(domain)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        client = _get_client()
+        urls: List[str] = []
+        try:
+            robots = await robots_cache.get(client, origin)
+            entries: List[FeedEntry] = []
+            for sitemap_url in (robots.site_maps() or [])[:2]:
+                parsed = await self._fetch_sitemap(client, sitemap_url)
+                entries.extend(parsed.entries)
+                # A sitemap index: follow its most recently changed child
+                if parsed.sitemaps:
+                    newest = max(parsed.sitemaps, key=lambda s: s.published or datetime.min.replace(tzinfo=timezone.utc))
+                    entries.extend((await self._fetch_sitemap(client, newest.url)).entries)
+
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=PREFETCH_MAX_ARTICLE_AGE)
+            fresh = sorted((e for e in entries if e.published and e.published > cutoff), key=lambda e: e.published, reverse=True)
+            urls = [e.url for e in fresh[:PREFETCH_URLS_PER_DOMAIN]]
+        except (httpx.HTTPError, ET.ParseError, ValueError) as e:
+            logger.warning(f"Prefetch discovery for {domain} failed: {str(e)}")
+
+        self._discovered[domain] = (urls, time.monotonic() + PREFETCH_DISCOVERY_INTERVAL)
+        return urls
+
+    async def _fetch_sitemap(self, client: httpx.AsyncClient, url: str):
+        async with host_scheduler.slot((urlsplit(url).hostname or "").lower()):
+            response = await client.get(url, headers={"User-Agent": USER_AGENT})
+        response.raise_for_status()
+        return parse_feed(response.text)
+
+    async def prefetch(self, url: str) -> bool:
+        """
+        Scrape and summarize one URL into the summary cache
+
+        Args:
+            url: The article URL
+
+        Returns:
+            bool: True if the article is now warm
+        """
+        wall_started = time.monotonic()
+        summarizations = 0
+        with measure_cpu() as cpu:
+            try:
+                content = await scrape_article(url, max_retries=1)
+                self._summarizations.append(time.monotonic())
+                summarizations = 1
+                await summarizer.summarize_text(content)
+                if get_summary_tier() == "cache":
+                    # Already cached: no API call or model run was spent
+                    self._summarizations.pop()
+                    summarizations = 0
+                elif not summary_is_reusable():
+                    # A fallback summary is not cached, so the article is not warm
+                    logger.info(f"Prefetching {url} degraded to {get_summary_tier()}, not keeping it")
+                    content = None
+            except Exception as e:
+                logger.info(f"Prefetching {url} failed: {str(e)}")
+                content = None
+
+        cpu_seconds = cpu.seconds
+        self.cpu_seconds += cpu_seconds
+        self.summarization_count += summarizations
+        if PREFETCH_CPU_BUDGET > 0:
+            self._next_work_at = time.monotonic() + cpu_seconds * (1 / PREFETCH_CPU_BUDGET - 1)
+
+        if content is None:
+            # Don't retry a failing URL every cycle
+            self._failed_until[url] = time.monotonic() + PREFETCH_DISCOVERY_INTERVAL
+            self.failed += 1
+            self._record_waste(cpu_seconds, summarizations)
+            return False
+
+        self._articles[url] = PrefetchedArticle(content, cpu_seconds, summarizations)
+        self._articles.move_to_end(url)
+        while len(self._articles) > PREFETCH_MAX_ENTRIES:
+            self._discard(next(iter(self._articles)))
+        self.prefetched += 1
+        logger.info(f"Prefetched {url} in {time.monotonic() - wall_started:.1f}s")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._articles),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "prefetched": self.prefetched,
+            "used": self.used,
+            "precision": round(self.used / self.prefetched, 4) if self.prefetched else 0.0,
+            "failed": self.failed,
+            "wasted": self.wasted,
+            "wasted_cpu_seconds": round(self.wasted_cpu_seconds, 3),
+            "wasted_summarizations": self.wasted_summarizations,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "summarizations": self.summarization_count,
+            "skipped_busy": self.skipped_busy,
+            "skipped_budget": self.skipped_budget
+        }
+
+
+# Create a singleton instance
+prefetcher = Prefetcher()
@@ -0,0 +1,236 @@
+import os
+import sys
+import hmac
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Profiling configuration
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_BLOCKING_THRESHOLD_MS = float(os.getenv("PROFILE_BLOCKING_THRESHOLD_MS", "100"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def _collapse_stack(frame) -> str:
+    """Render a frame stack root-first in the collapsed format used by flamegraph.pl and speedscope"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        name = getattr(code, "co_qualname", code.co_name)
+        parts.append(f"{name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class ProfileSession:
+    """
+    Samples the event loop thread while one request is being served
+
+    The sampler runs in a daemon thread, so the loop itself pays only for a
+    small heartbeat task. When the heartbeat goes stale for longer than
+    PROFILE_BLOCKING_THRESHOLD_MS the loop is blocked and the current stack
+    is recorded as a blocking event. Samples cover everything running on the
+    loop, including other requests served concurrently.
+    """
+
+    def __init__(self, profile_id: str, thread_id: int):
+        self.profile_id = profile_id
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self.blocking_events: List[Dict] = []
+        self._interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+        self._threshold = PROFILE_BLOCKING_THRESHOLD_MS / 1000
+        self._heartbeat = time.perf_counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.started_at = time.perf_counter()
+
+    def start(self):
+        self._heartbeat_task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._sample, name=f"profiler-{self.profile_id}", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> float:
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+        return time.perf_counter() - self.started_at
+
+    async def _beat(self):
+        while True:
+            self._heartbeat = time.perf_counter()
+            await asyncio.sleep(self._interval)
+
+    def _sample(self):
+        blocked: Optional[Dict] = None
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = _collapse_stack(frame)
+            self.samples[stack] += 1
+
+            stalled = time.perf_counter() - self._heartbeat
+            if stalled > self._threshold:
+                if blocked is None:
+                    blocked = {"stack": stack.split(";"), "duration_ms": 0.0}
+                    self.blocking_events.append(blocked)
+                blocked["duration_ms"] = round(stalled * 1000, 1)
+            else:
+                blocked = None
+
+
+class RequestProfiler:
+    """Decides which requests to profile and stores the resulting profiles"""
+
+    def __init__(self):
+        self.enabled = bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+        self._active = False
+
+    def should_profile(self, headers: List) -> bool:
+        if PROFILE_TOKEN:
+            token = PROFILE_TOKEN.encode("latin-1")
+            for name, value in headers:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, token)
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    def try_begin(self) -> Optional[ProfileSession]:
+        # Only one profile at a time: samples are loop-wide anyway
+        if self._active:
+            return None
+        self._active = True
+        profile_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        session = ProfileSession(profile_id, threading.get_ident())
+        session.start()
+        return session
+
+    async def finish(self, session: ProfileSession, method: str, path: str, status_code: Optional[int]):
+        try:
+            duration = await session.stop()
+            metadata = {
+                "id": session.profile_id,
+                "method": method,
+                "path": path,
+                "status_code": status_code,
+                "duration_ms": round(duration * 1000, 1),
+                "sample_interval_ms": PROFILE_SAMPLE_INTERVAL_MS,
+                "samples": sum(session.samples.values()),
+                "blocking_threshold_ms": PROFILE_BLOCKING_THRESHOLD_MS,
+                "blocking_events": session.blocking_events
+            }
+            await asyncio.to_thread(self._write, session, metadata)
+            logger.info(
+                f"Saved profile {session.profile_id} for {method} {path} "
+                f"({metadata['samples']} samples, {len(session.blocking_events)} blocking events)"
+            )
+        except Exception as e:
+            logger.error(f"Failed to save profile {session.profile_id}: {str(e)}")
+        finally:
+            self._active = False
+
+    def _write(self, session: ProfileSession, metadata: Dict):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, session.profile_id)
+        with open(f"{base}.collapsed", "w") as f:
+            for stack, count in session.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(f"{base}.json", "w") as f:
+            json.dump(metadata, f, indent=2)
+        self._prune()
+
+    def _prune(self):
+        profiles = sorted(p for p in os.listdir(PROFILE_DIR) if p.endswith(".json"))
+        for stale in profiles[:max(0, len(profiles) - PROFILE_MAX_FILES)]:
+            for suffix in (".json", ".collapsed"):
+                path = os.path.join(PROFILE_DIR, stale[:-len(".json")] + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def list_profiles(self) -> List[Dict]:
+        """Return the metadata of stored profiles, newest first"""
+        if not os.path.isdir(PROFILE_DIR):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(PROFILE_DIR, name)) as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                continue
+            metadata.pop("blocking_events", None)
+            profiles.append(metadata)
+        return profiles
+
+    def profile_path(self, profile_id: str, kind: str) -> Optional[str]:
+        """Resolve a stored profile file, refusing anything outside PROFILE_DIR"""
+        suffix = {"collapsed": ".collapsed", "metadata": ".json"}.get(kind)
+        if suffix is None or os.path.basename(profile_id) != profile_id:
+            return None
+        path = os.path.join(PROFILE_DIR, profile_id + suffix)
+        return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles opted-in requests
+
+    Requests are profiled when they carry the X-Profile-Token header matching
+    PROFILE_TOKEN, or at random with probability PROFILE_SAMPLE_RATE. With
+    both unset the middleware is a single attribute check per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.enabled or scope["type"] != "http" or not profiler.should_profile(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        session = profiler.try_begin()
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, session.profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            await profiler.finish(session, scope["method"], scope["path"], status_code)
+
+
+# Create a singleton instance
+profiler = RequestProfiler()
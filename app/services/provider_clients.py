@@ -0,0 +1,106 @@
+import os
+import logging
+import httpx
+import openai
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# Connection pool configuration shared by all provider clients
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "60"))
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "20"))
+PROVIDER_MAX_KEEPALIVE = int(os.getenv("PROVIDER_MAX_KEEPALIVE", "10"))
+PROVIDER_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "60"))
+
+
+class ConnectionMetrics:
+    """Counts requests against new TCP connections and TLS handshakes using the httpx trace extension"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+
+    async def on_request(self, request: httpx.Request):
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        reused = max(0, self.requests - self.connections_opened)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0
+        }
+
+
+class ProviderClients:
+    """
+    App-lifetime HTTP clients for the summarization providers
+
+    Clients are created on first use and keep their connection pools warm
+    between calls; close() is called from the FastAPI shutdown hook.
+    """
+
+    def __init__(self):
+        self._openai: Optional[openai.AsyncOpenAI] = None
+        self._huggingface: Optional[httpx.AsyncClient] = None
+        self._metrics: Dict[str, ConnectionMetrics] = {
+            "openai": ConnectionMetrics(),
+            "huggingface": ConnectionMetrics()
+        }
+
+    def _http_client(self, name: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(PROVIDER_TIMEOUT, connect=PROVIDER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=PROVIDER_MAX_CONNECTIONS,
+                max_keepalive_connections=PROVIDER_MAX_KEEPALIVE,
+                keepalive_expiry=PROVIDER_KEEPALIVE_EXPIRY
+            ),
+            event_hooks={"request": [self._metrics[name].on_request]}
+        )
+
+    def openai_client(self) -> openai.AsyncOpenAI:
+        if self._openai is None:
+            self._openai = openai.AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=self._http_client("openai")
+            )
+            logger.info("Created pooled OpenAI client")
+        return self._openai
+
+    def huggingface_client(self) -> httpx.AsyncClient:
+        if self._huggingface is None or self._huggingface.is_closed:
+            self._huggingface = self._http_client("huggingface")
+            logger.info("Created pooled HuggingFace client")
+        return self._huggingface
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metrics.snapshot() for name, metrics in self._metrics.items()}
+
+    async def close(self):
+        if self._openai is not None:
+            await self._openai.close()
+            self._openai = None
+        if self._huggingface is not None:
+            await self._huggingface.aclose()
+            self._huggingface = None
+
+
+# Create a singleton instance
+provider_clients = ProviderClients()
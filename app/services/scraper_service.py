@@ -1,73 +1,364 @@
+import os
+import time
+import socket
+import asyncio
+import logging
 import httpx
+import httpcore
 from bs4 import BeautifulSoup
+from contextlib import asynccontextmanager
 from fastapi import HTTPException
-import logging
-import time
-from typing import Optional, Tuple
+from dotenv import load_dotenv
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from .cpu_accounting import charge_cpu
+from .deadline import Deadline, DeadlineExceeded
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-async def scrape_article(url: str, max_retries: int = 3, retry_delay: int = 2) -> str:
+# Politeness configuration
+SCRAPER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_HOST_CONCURRENCY", "2"))
+SCRAPER_HOST_MIN_DELAY = float(os.getenv("SCRAPER_HOST_MIN_DELAY", "1.0"))
+SCRAPER_RESPECT_ROBOTS = os.getenv("SCRAPER_RESPECT_ROBOTS", "true").lower() == "true"
+SCRAPER_ROBOTS_TTL = float(os.getenv("SCRAPER_ROBOTS_TTL", "3600"))
+SCRAPER_ROBOTS_ERROR_TTL = float(os.getenv("SCRAPER_ROBOTS_ERROR_TTL", "300"))
+SCRAPER_DNS_TTL = float(os.getenv("SCRAPER_DNS_TTL", "300"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+
+# How often per-host state (DNS, robots.txt, politeness) is swept for idle hosts
+STATE_SWEEP_INTERVAL = 60.0
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+ROBOTS_USER_AGENT = os.getenv("SCRAPER_ROBOTS_USER_AGENT", "Web3ArticleSummarizer")
+
+
+class DNSCache:
+    """Caches getaddrinfo results per host for SCRAPER_DNS_TTL seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[List[str], float]] = {}
+        self._locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+        self._next_sweep = 0.0
+
+    def _sweep(self):
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + STATE_SWEEP_INTERVAL
+        for key in [k for k, (_, expires) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        for key in [k for k, lock in self._locks.items() if k not in self._entries and not lock.locked()]:
+            del self._locks[key]
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        self._sweep()
+        cached = self._entries.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._entries.get(key)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+            self._entries[key] = (addresses, time.monotonic() + self.ttl)
+            return addresses
+
+
+class _CachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that connects to cached addresses
+
+    httpcore still performs the TLS handshake with the original host name as
+    SNI, so only the address lookup is replaced.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, dns_cache: DNSCache):
+        self._backend = backend
+        self._dns_cache = dns_cache
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = await self._dns_cache.resolve(host, port)
+        except OSError:
+            addresses = []
+        if not addresses:
+            # Let the underlying backend resolve (and report errors for) the host itself
+            addresses = [host]
+
+        last_error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout,
+                    local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as e:
+                last_error = e
+        raise last_error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _CachedDNSTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, dns_cache: DNSCache, **kwargs):
+        super().__init__(**kwargs)
+        # httpx does not expose the network backend, so wrap the pool's one
+        if hasattr(self._pool, "_network_backend"):
+            self._pool._network_backend = _CachedDNSBackend(self._pool._network_backend, dns_cache)
+        else:
+            logger.warning(
+                "Could not install the DNS cache: the httpcore connection pool has no "
+                "_network_backend attribute; hosts will be resolved on every connection"
+            )
+
+
+class HostScheduler:
+    """
+    Per-host politeness: at most SCRAPER_HOST_CONCURRENCY requests in flight
+    per host and at least SCRAPER_HOST_MIN_DELAY seconds (or the robots.txt
+    crawl-delay, if larger) between request starts. Different hosts never
+    wait on each other.
+    """
+
+    def __init__(self, concurrency: int, min_delay: float):
+        self.concurrency = concurrency
+        self.min_delay = min_delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+        self._users: Dict[str, int] = {}
+        self._next_sweep = 0.0
+
+    def _sweep(self):
+        """Forget hosts with no request in flight or queued whose delay has passed"""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + STATE_SWEEP_INTERVAL
+        idle = [
+            host for host in self._semaphores
+            if not self._users.get(host) and self._next_start.get(host, 0.0) <= now
+        ]
+        for host in idle:
+            self._semaphores.pop(host, None)
+            self._locks.pop(host, None)
+            self._next_start.pop(host, None)
+            self._users.pop(host, None)
+
+    @asynccontextmanager
+    async def slot(self, host: str, delay: Optional[float] = None, deadline: Optional[Deadline] = None):
+        self._sweep()
+        self._users[host] = self._users.get(host, 0) + 1
+        try:
+            semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+            lock = self._locks.setdefault(host, asyncio.Lock())
+            async with semaphore:
+                async with lock:
+                    wait = self._next_start.get(host, 0.0) - time.monotonic()
+                    if wait > 0:
+                        # Don't queue behind the politeness delay if the request can't wait that long
+                        if deadline is not None and wait >= deadline.remaining():
+                            raise DeadlineExceeded(f"waiting for a fetch slot on {host}")
+                        await asyncio.sleep(wait)
+                    self._next_start[host] = time.monotonic() + max(self.min_delay, delay or 0.0)
+                yield
+        finally:
+            self._users[host] -= 1
+
+
+class RobotsCache:
+    """Fetches and caches robots.txt per origin"""
+
+    def __init__(self, ttl: float, error_ttl: float):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self._entries: Dict[str, Tuple[RobotFileParser, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_sweep = 0.0
+
+    def _sweep(self):
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + STATE_SWEEP_INTERVAL
+        for origin in [o for o, (_, expires) in self._entries.items() if expires <= now]:
+            del self._entries[origin]
+        for origin in [o for o, lock in self._locks.items() if o not in self._entries and not lock.locked()]:
+            del self._locks[origin]
+
+    async def get(self, client: httpx.AsyncClient, origin: str) -> RobotFileParser:
+        self._sweep()
+        cached = self._entries.get(origin)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            cached = self._entries.get(origin)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+            parser = RobotFileParser()
+            ttl = self.ttl
+            try:
+                response = await client.get(f"{origin}/robots.txt", headers={"User-Agent": USER_AGENT})
+                if response.status_code in (401, 403):
+                    parser.disallow_all = True
+                elif response.status_code >= 500:
+                    # RFC 9309: an unreachable robots.txt means a complete disallow,
+                    # retried sooner than a successful fetch
+                    logger.warning(f"robots.txt for {origin} returned {response.status_code}; disallowing for now")
+                    parser.disallow_all = True
+                    ttl = self.error_ttl
+                elif response.status_code >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse(response.text.splitlines())
+            except httpx.HTTPError as e:
+                logger.warning(f"Could not fetch robots.txt for {origin}: {str(e)}")
+                parser.allow_all = True
+                ttl = self.error_ttl
+
+            self._entries[origin] = (parser, time.monotonic() + ttl)
+            return parser
+
+
+dns_cache = DNSCache(SCRAPER_DNS_TTL)
+host_scheduler = HostScheduler(SCRAPER_HOST_CONCURRENCY, SCRAPER_HOST_MIN_DELAY)
+robots_cache = RobotsCache(SCRAPER_ROBOTS_TTL, SCRAPER_ROBOTS_ERROR_TTL)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared scraping client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            transport=_CachedDNSTransport(dns_cache),
+            timeout=SCRAPER_TIMEOUT,
+            follow_redirects=True
+        )
+    return _client
+
+
+async def close_scraper_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def scrape_article(
+    url: str,
+    max_retries: int = 3,
+    retry_delay: int = 2,
+    deadline: Optional[Deadline] = None
+) -> str:
     logger.info(f"Starting to scrape article from: {url}")
     retry_count = 0
-    
+
     while retry_count < max_retries:
         try:
-            content, title = await _fetch_and_parse(url)
+            fetch = _fetch_and_parse(url, deadline)
+            content, title = await (deadline.run(fetch, "scraping") if deadline else fetch)
             logger.info(f"Successfully scraped article: {title if title else 'Untitled'}")
             return content
+        except HTTPException:
+            raise
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error when fetching {url}: {e.response.status_code}")
             if e.response.status_code >= 500 and retry_count < max_retries - 1:
+                _check_retry_budget(deadline, retry_delay)
                 retry_count += 1
                 logger.info(f"Retrying in {retry_delay} seconds (attempt {retry_count}/{max_retries})")
-                time.sleep(retry_delay)
+                await asyncio.sleep(retry_delay)
                 continue
             raise HTTPException(status_code=400, detail=f"Failed to fetch article: HTTP error {e.response.status_code}")
         except httpx.RequestError as e:
             logger.error(f"Request error when fetching {url}: {str(e)}")
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("scraping")
             if retry_count < max_retries - 1:
+                _check_retry_budget(deadline, retry_delay)
                 retry_count += 1
                 logger.info(f"Retrying in {retry_delay} seconds (attempt {retry_count}/{max_retries})")
-                time.sleep(retry_delay)
+                await asyncio.sleep(retry_delay)
                 continue
             raise HTTPException(status_code=500, detail=f"Failed to fetch article: {str(e)}")
         except Exception as e:
             logger.error(f"Unexpected error when scraping {url}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to scrape article: {str(e)}")
 
-async def _fetch_and_parse(url: str) -> Tuple[str, Optional[str]]:
-    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        response = await client.get(url, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        title_tag = soup.find("title")
-        title = title_tag.text if title_tag else None
-        
-        for element in soup(["script", "style", "nav", "footer", "header", "aside", "iframe"]):
-            element.extract()
-        
-        main_content = None
-        for tag in ["article", "main", "div.content", "div.post", "div.article"]:
-            content_section = soup.select_one(tag)
-            if content_section:
-                main_content = content_section
-                break
-        
-        if not main_content:
-            main_content = soup.body
-        
-        text = main_content.get_text() if main_content else soup.get_text()
-        
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        if len(text) < 500:
-            logger.warning(f"Scraped content from {url} is suspiciously short ({len(text)} chars)")
-        
-        return text, title
+def _check_retry_budget(deadline: Optional[Deadline], retry_delay: float):
+    # A retry that cannot start before the deadline is not worth waiting for
+    if deadline is not None and deadline.remaining() <= retry_delay:
+        raise DeadlineExceeded("scraping (no budget left to retry)")
+
+def _extract_text(html: str) -> Tuple[str, Optional[str]]:
+    """Return the main text and the title of an HTML page"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    title_tag = soup.find("title")
+    title = title_tag.text if title_tag else None
+
+    for element in soup(["script", "style", "nav", "footer", "header", "aside", "iframe"]):
+        element.extract()
+
+    main_content = None
+    for tag in ["article", "main", "div.content", "div.post", "div.article"]:
+        content_section = soup.select_one(tag)
+        if content_section:
+            main_content = content_section
+            break
+
+    if not main_content:
+        main_content = soup.body
+
+    text = main_content.get_text() if main_content else soup.get_text()
+
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
+
+    return text, title
+
+async def _fetch_and_parse(url: str, deadline: Optional[Deadline] = None) -> Tuple[str, Optional[str]]:
+    client = _get_client()
+    timeout = deadline.timeout(SCRAPER_TIMEOUT) if deadline else SCRAPER_TIMEOUT
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+
+    crawl_delay = None
+    if SCRAPER_RESPECT_ROBOTS:
+        robots = await robots_cache.get(client, f"{parts.scheme}://{parts.netloc}")
+        if not robots.can_fetch(ROBOTS_USER_AGENT, url):
+            logger.warning(f"Fetching {url} is disallowed by robots.txt")
+            raise HTTPException(status_code=403, detail="Fetching this article is disallowed by robots.txt")
+        crawl_delay = robots.crawl_delay(ROBOTS_USER_AGENT)
+
+    async with host_scheduler.slot(host, float(crawl_delay) if crawl_delay else None, deadline):
+        response = await client.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+    response.raise_for_status()
+
+    with charge_cpu():
+        text, title = _extract_text(response.text)
+
+    if len(text) < 500:
+        logger.warning(f"Scraped content from {url} is suspiciously short ({len(text)} chars)")
+
+    return text, title
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import openai
 import httpx
 import json
@@ -6,8 +7,15 @@ from transformers import pipeline
 from fastapi import HTTPException
 from dotenv import load_dotenv
 import logging
+from contextvars import ContextVar
 from typing import Dict, Any, Optional
 
+from .provider_clients import provider_clients
+from .summary_cache import summary_cache, make_cache_key
+from .onnx_backend import create_onnx_pipeline
+from .cpu_accounting import charge_cpu
+from .deadline import Deadline, DeadlineExceeded
+
 # Load environment variables
 load_dotenv()
 
@@ -21,6 +29,44 @@ HF_API_URL = "https://api-inference.huggingface.co/models/"
 # Get the model from environment variable or use default
 HF_MODEL = os.getenv("HUGGINGFACE_MODEL", "facebook/bart-large-cnn")
 
+# OpenAI generation settings
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_MAX_TOKENS = 500
+OPENAI_TEMPERATURE = 0.5
+
+# HuggingFace generation settings
+HF_CHUNK_SIZE = 3000
+HF_SUMMARY_MAX_LENGTH = 250
+
+# Latency-budget degradation: below these remaining budgets (seconds) a
+# request skips provider calls entirely, or switches to a faster model
+DEADLINE_EXTRACTIVE_BELOW = float(os.getenv("DEADLINE_EXTRACTIVE_BELOW", "3"))
+DEADLINE_FAST_MODEL_BELOW = float(os.getenv("DEADLINE_FAST_MODEL_BELOW", "15"))
+DEADLINE_FAST_MODEL = os.getenv("DEADLINE_FAST_MODEL", "sshleifer/distilbart-cnn-12-6")
+
+# Set when a provider call degraded to a fallback, so the result is not cached
+_used_fallback: ContextVar[bool] = ContextVar("used_fallback", default=False)
+
+# How the last summary in this request was produced: full, cache, or the
+# degradations applied joined with "+" (fast_model, extractive)
+_summary_tier: ContextVar[str] = ContextVar("summary_tier", default="full")
+
+def get_summary_tier() -> str:
+    """Return how the most recent summary of the current request was produced"""
+    return _summary_tier.get()
+
+def summary_is_reusable() -> bool:
+    """Whether the most recent summary came from the full path, so it may be reused for other articles"""
+    return _summary_tier.get() == "full" and not _used_fallback.get()
+
+def _degrade_summary_tier(tier: str) -> None:
+    """Record a degradation, keeping the ones already applied to this summary"""
+    current = _summary_tier.get()
+    if current == "full":
+        _summary_tier.set(tier)
+    elif tier not in current.split("+"):
+        _summary_tier.set(f"{current}+{tier}")
+
 # List of recommended summarization models
 RECOMMENDED_MODELS = {
     "facebook/bart-large-cnn": "Good general-purpose news summarizer",
@@ -30,11 +76,34 @@ RECOMMENDED_MODELS = {
     "facebook/bart-large-xsum": "Extreme summarization (very concise)"
 }
 
+# Local inference backends, selected with LOCAL_BACKEND
+LOCAL_BACKENDS = {
+    "pytorch": "transformers pipeline with fp32 PyTorch weights",
+    "onnx": "int8 dynamically quantized ONNX export of HUGGINGFACE_MODEL on ONNX Runtime (CPU)"
+}
+
+# Unset keeps the PyTorch pipeline as HuggingFace fallback only; setting it
+# also enables local summarization when no API keys are configured
+LOCAL_BACKEND = os.getenv("LOCAL_BACKEND")
+LOCAL_SUMMARY_MAX_LENGTH = 150
+LOCAL_SUMMARY_MIN_LENGTH = 40
+
+def create_local_pipeline(backend: str, model_name: Optional[str] = None):
+    """Create a local summarization pipeline for one of LOCAL_BACKENDS"""
+    if backend not in LOCAL_BACKENDS:
+        raise ValueError(f"Unknown local backend: {backend} (choose from {', '.join(LOCAL_BACKENDS)})")
+    # Both backends default to HUGGINGFACE_MODEL so they can be compared like for like
+    model_name = model_name or HF_MODEL
+    if backend == "onnx":
+        return create_onnx_pipeline(model_name)
+    return pipeline("summarization", model=model_name)
+
 class SummarizerService:
     def __init__(self):
         # Determine which service to use based on available API keys
         if OPENAI_API_KEY:
             self.service_type = "openai"
+            self.model_name = OPENAI_MODEL
             openai.api_key = OPENAI_API_KEY
             logging.info("Using OpenAI for summarization")
         elif HUGGINGFACE_API_KEY:
@@ -51,116 +120,237 @@ class SummarizerService:
             
             # Also initialize a local pipeline as fallback if possible
             try:
-                self.local_pipeline = pipeline("summarization")
+                backend = "onnx" if LOCAL_BACKEND == "onnx" else "pytorch"
+                self.local_pipeline = create_local_pipeline(backend, HF_MODEL)
                 logging.info("Successfully initialized local HuggingFace pipeline as fallback")
                 self.has_local_fallback = True
             except Exception as e:
                 logging.warning(f"Could not initialize local HuggingFace pipeline: {e}")
                 self.has_local_fallback = False
+        elif LOCAL_BACKEND and self._init_local_backend():
+            logging.info(f"Using local {LOCAL_BACKEND} backend with model: {self.model_name}")
         else:
             # If no API keys are available, use mock service for testing
             logging.warning("No API keys found for OpenAI or HuggingFace. Using mock summarizer.")
             self.service_type = "mock"
+            self.model_name = "extractive"
+    
+    def _init_local_backend(self) -> bool:
+        """Set up CPU-only local summarization; returns False to fall back to the mock service"""
+        try:
+            self.local_pipeline = create_local_pipeline(LOCAL_BACKEND, HF_MODEL)
+        except Exception as e:
+            logging.warning(f"Could not initialize local {LOCAL_BACKEND} backend: {e}")
+            return False
+        self.service_type = "local"
+        self.model_name = HF_MODEL
+        self.has_local_fallback = True
+        logging.info(f"Backend description: {LOCAL_BACKENDS[LOCAL_BACKEND]}")
+        return True
+    
+    def cache_params(self, max_length: int) -> Dict[str, Any]:
+        """Generation settings that affect the summary, used in the summary cache key"""
+        if self.service_type == "openai":
+            return {"max_tokens": OPENAI_MAX_TOKENS, "temperature": OPENAI_TEMPERATURE, "max_length": max_length}
+        if self.service_type == "huggingface":
+            return {"chunk_size": HF_CHUNK_SIZE, "summary_max_length": HF_SUMMARY_MAX_LENGTH, "max_length": max_length}
+        if self.service_type == "local":
+            return {"backend": LOCAL_BACKEND, "summary_max_length": LOCAL_SUMMARY_MAX_LENGTH, "max_length": max_length}
+        return {"max_length": max_length}
+    
+    def _cache_key(self, text: str, max_length: int) -> str:
+        return make_cache_key(text[:max_length], self.service_type, self.model_name, self.cache_params(max_length))
     
-    async def summarize_text(self, text: str, max_length: int = 1500) -> str:
+    async def get_cached_summary(self, text: str, max_length: int = 1500) -> Optional[str]:
+        """
+        Look up the summary cache without calling a provider
+        
+        Identical text (after normalization) under any URL reuses the stored summary.
+        
+        Args:
+            text: The text to summarize
+            max_length: Maximum length of text to summarize, as passed to summarize_text
+            
+        Returns:
+            Optional[str]: The cached summary, None on a miss
+        """
+        cached = await summary_cache.get(self._cache_key(text, max_length))
+        if cached is not None:
+            logging.info("Summary cache hit")
+            _summary_tier.set("cache")
+        return cached
+    
+    async def summarize_text(
+        self,
+        text: str,
+        max_length: int = 1500,
+        deadline: Optional[Deadline] = None,
+        check_cache: bool = True
+    ) -> str:
         """
         Summarize the provided text using either OpenAI, HuggingFace, or a mock service
         
         Args:
             text: The text to summarize
             max_length: Maximum length of text to summarize (for truncation)
+            deadline: Optional request deadline; a short budget selects a cheaper
+                path and work that runs past it is cancelled
+            check_cache: False when the caller already missed in get_cached_summary
             
         Returns:
             str: Summarized text
         """
+        if check_cache:
+            cached = await self.get_cached_summary(text, max_length)
+            if cached is not None:
+                return cached
+        
         # Truncate text if too long
         if len(text) > max_length:
             text = text[:max_length]
+        cache_key = self._cache_key(text, max_length)
+        
+        _used_fallback.set(False)
+        _summary_tier.set("full")
+        if deadline is not None and self.service_type != "mock" and deadline.remaining() < DEADLINE_EXTRACTIVE_BELOW:
+            logging.warning(f"Only {deadline.remaining():.1f}s left, using extractive summary")
+            _summary_tier.set("extractive")
+            return await self._mock_summarize(text)
         
         try:
             if self.service_type == "openai":
-                return await self._summarize_with_openai(text)
+                summary = await self._summarize_with_openai(text, deadline)
             elif self.service_type == "huggingface":
-                return await self._summarize_with_huggingface(text)
+                summary = await self._summarize_with_huggingface(text, deadline)
+            elif self.service_type == "local":
+                summary = await self._summarize_locally(text, deadline)
             else:
-                return await self._mock_summarize(text)
+                summary = await self._mock_summarize(text)
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Summarization failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Summarization failed: {str(e)}")
+        
+        if summary and summary_is_reusable():
+            await summary_cache.put(cache_key, self.service_type, self.model_name, summary)
+        return summary
     
-    async def _summarize_with_openai(self, text: str) -> str:
+    async def _summarize_with_openai(self, text: str, deadline: Optional[Deadline] = None) -> str:
         """Use OpenAI API to summarize text"""
         try:
-            # Modern OpenAI client implementation
-            client = openai.AsyncOpenAI(api_key=OPENAI_API_KEY)
-            response = await client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            # Modern OpenAI client implementation, reused across calls
+            client = provider_clients.openai_client()
+            request = client.chat.completions.create(
+                model=OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that summarizes articles."},
                     {"role": "user", "content": f"Please summarize the following article: {text}"}
                 ],
-                max_tokens=500,
-                temperature=0.5
+                max_tokens=OPENAI_MAX_TOKENS,
+                temperature=OPENAI_TEMPERATURE
             )
+            response = await (deadline.run(request, "summarization") if deadline else request)
             return response.choices[0].message.content
         except ImportError:
             # Fallback for older versions of the OpenAI library
             response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
+                model=OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant that summarizes articles."},
                     {"role": "user", "content": f"Please summarize the following article: {text}"}
                 ],
-                max_tokens=500,
-                temperature=0.5
+                max_tokens=OPENAI_MAX_TOKENS,
+                temperature=OPENAI_TEMPERATURE
             )
             return response.choices[0].message.content
     
-    async def _summarize_with_huggingface(self, text: str) -> str:
+    async def _summarize_locally(self, text: str, deadline: Optional[Deadline] = None) -> str:
+        """Use the local pipeline (PyTorch or ONNX Runtime) to summarize text"""
+        # Inference is CPU-bound, so keep it off the event loop. A thread cannot
+        # be interrupted: past the deadline the request stops waiting for it.
+        def run_pipeline():
+            with charge_cpu():
+                return self.local_pipeline(
+                    text,
+                    max_length=LOCAL_SUMMARY_MAX_LENGTH,
+                    min_length=LOCAL_SUMMARY_MIN_LENGTH,
+                    do_sample=False,
+                    truncation=True
+                )
+
+        inference = asyncio.to_thread(run_pipeline)
+        result = await (deadline.run(inference, "local summarization") if deadline else inference)
+        return result[0]['summary_text']
+    
+    async def _summarize_with_huggingface(self, text: str, deadline: Optional[Deadline] = None) -> str:
         """Use HuggingFace Inference API to summarize text"""
         # For the Inference API, we need to limit text length and chunk it appropriately
         # Most models have a max token limit (e.g., 1024 tokens)
         
         # Split longer texts into manageable chunks
         # BART models typically handle ~1024 tokens which is roughly 750-1000 chars
-        chunks = [text[i:i+3000] for i in range(0, len(text), 3000)]
+        chunks = [text[i:i+HF_CHUNK_SIZE] for i in range(0, len(text), HF_CHUNK_SIZE)]
         all_summaries = []
         
+        # On a short budget, switch to a faster model
+        model_name = self.model_name
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining < DEADLINE_FAST_MODEL_BELOW and DEADLINE_FAST_MODEL and DEADLINE_FAST_MODEL != model_name:
+                logging.warning(f"Switching to {DEADLINE_FAST_MODEL} with {remaining:.1f}s left")
+                model_name = DEADLINE_FAST_MODEL
+                _degrade_summary_tier("fast_model")
+        
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                for chunk in chunks:
-                    # First try the HuggingFace Inference API
-                    try:
-                        summary = await self._call_huggingface_api(client, chunk)
-                        if summary:
-                            all_summaries.append(summary)
-                        else:
-                            # If the API call returns empty, use fallback methods
-                            fallback_summary = await self._huggingface_fallback(chunk)
-                            all_summaries.append(fallback_summary)
-                    except Exception as e:
-                        logging.error(f"HuggingFace API error: {str(e)}")
-                        # Use fallback if API call fails
-                        fallback_summary = await self._huggingface_fallback(chunk)
+            # Pooled app-lifetime client, so chunks and articles share warm connections
+            client = provider_clients.huggingface_client()
+            for chunk in chunks:
+                # First try the HuggingFace Inference API
+                try:
+                    summary = await self._call_huggingface_api(client, chunk, model_name, deadline)
+                    if summary:
+                        all_summaries.append(summary)
+                    else:
+                        # If the API call returns empty, use fallback methods
+                        fallback_summary = await self._huggingface_fallback(chunk, deadline)
                         all_summaries.append(fallback_summary)
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    logging.error(f"HuggingFace API error: {str(e)}")
+                    # Use fallback if API call fails
+                    fallback_summary = await self._huggingface_fallback(chunk, deadline)
+                    all_summaries.append(fallback_summary)
             
             # Combine the summaries from all chunks
             return " ".join(all_summaries).strip()
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logging.error(f"Error during HuggingFace summarization: {str(e)}")
             # Last resort fallback to mock summarizer
+            _used_fallback.set(True)
+            _degrade_summary_tier("extractive")
             return await self._mock_summarize(text)
     
-    async def _call_huggingface_api(self, client: httpx.AsyncClient, text: str) -> Optional[str]:
+    async def _call_huggingface_api(
+        self,
+        client: httpx.AsyncClient,
+        text: str,
+        model_name: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
         """Call the HuggingFace Inference API for summarization"""
+        model_name = model_name or self.model_name
         # Adjust parameters based on model type
-        if 't5' in self.model_name.lower():
+        if 't5' in model_name.lower():
             # T5 models need different parameters
             payload = {
                 "inputs": text,
                 "parameters": {
-                    "max_length": 250,
+                    "max_length": HF_SUMMARY_MAX_LENGTH,
                     "min_length": 40,
                     "do_sample": False,
                     "task": "summarization"
@@ -171,17 +361,18 @@ class SummarizerService:
             payload = {
                 "inputs": text,
                 "parameters": {
-                    "max_length": 250,
+                    "max_length": HF_SUMMARY_MAX_LENGTH,
                     "min_length": 50,
                     "do_sample": False
                 }
             }
         
-        response = await client.post(
-            f"{HF_API_URL}{self.model_name}",
+        request = client.post(
+            f"{HF_API_URL}{model_name}",
             headers=self.hf_headers,
             json=payload
         )
+        response = await (deadline.run(request, "summarization") if deadline else request)
         
         if response.status_code == 200:
             result = response.json()
@@ -197,17 +388,20 @@ class SummarizerService:
         # Return None if we couldn't parse the response
         return None
         
-    async def _huggingface_fallback(self, text: str) -> str:
+    async def _huggingface_fallback(self, text: str, deadline: Optional[Deadline] = None) -> str:
         """Fallback method when the HuggingFace API fails"""
+        _used_fallback.set(True)
         # Try the local pipeline if available
         if hasattr(self, 'has_local_fallback') and self.has_local_fallback:
             try:
-                result = self.local_pipeline(text, max_length=150, min_length=40, do_sample=False)
-                return result[0]['summary_text']
+                return await self._summarize_locally(text, deadline)
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 logging.error(f"Local pipeline fallback failed: {str(e)}")
                 
         # If local pipeline fails or isn't available, use mock summarizer
+        _degrade_summary_tier("extractive")
         return await self._mock_summarize(text)
         
     async def _mock_summarize(self, text: str) -> str:
@@ -1,11 +1,65 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, update, delete
 from sqlalchemy.future import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from fastapi import Depends
-from typing import List, Optional
+from datetime import date, datetime, timezone
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 from .. import models
 from ..database import get_db
+from .near_duplicate import (
+    NEAR_DUPLICATE_MIN_LENGTH, bands, hamming_distance, simhash, to_signed, to_unsigned
+)
+
+logger = logging.getLogger(__name__)
+
+# Dimensions tracked in the usage_aggregates table
+AGGREGATE_TOTAL = "total"
+AGGREGATE_WALLET = "wallet"
+AGGREGATE_DOMAIN = "domain"
+AGGREGATE_DAY = "day"
+AGGREGATE_PROVIDER = "provider"
+
+def article_domain(article_url: str) -> str:
+    """Return the host of an article URL without a leading www."""
+    host = (urlparse(article_url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def _aggregate_keys(
+    wallet_address: str,
+    article_url: str,
+    provider: Optional[str],
+    day: date
+) -> List[Tuple[str, str]]:
+    return [
+        (AGGREGATE_TOTAL, ""),
+        (AGGREGATE_WALLET, wallet_address),
+        (AGGREGATE_DOMAIN, article_domain(article_url)),
+        (AGGREGATE_DAY, day.isoformat()),
+        (AGGREGATE_PROVIDER, provider or "unknown"),
+    ]
+
+def article_fingerprint(
+    fingerprint: int,
+    provider: str,
+    model: str,
+    cache_version: str,
+    **columns
+) -> models.ArticleFingerprint:
+    """Build an article_fingerprints row for a SimHash and the configuration that summarized the article"""
+    band_values = bands(fingerprint)
+    return models.ArticleFingerprint(
+        simhash=to_signed(fingerprint),
+        provider=provider,
+        model=model,
+        cache_version=cache_version,
+        **{f"band{i}": value for i, value in enumerate(band_values)},
+        **columns
+    )
 
 class SummaryRepository:
     def __init__(self, db: AsyncSession = Depends(get_db)):
@@ -16,16 +70,23 @@ class SummaryRepository:
         wallet_address: str,
         article_url: str,
         original_content: str,
-        summary_content: str
+        summary_content: str,
+        provider: Optional[str] = None,
+        fingerprint: Optional[models.ArticleFingerprint] = None
     ) -> models.Summary:
         """
         Create a new summary in the database
         
+        The usage aggregates and the article fingerprint are written in the
+        same transaction.
+        
         Args:
             wallet_address: The wallet address of the user
             article_url: The URL of the article
             original_content: The original content of the article
             summary_content: The summarized content
+            provider: The summarization provider that produced the summary
+            fingerprint: Unsaved article fingerprint, stored for near-duplicate lookups
             
         Returns:
             models.Summary: The created summary object
@@ -37,6 +98,12 @@ class SummaryRepository:
             summary_content=summary_content
         )
         self.db.add(db_summary)
+        if fingerprint is not None:
+            await self.db.flush()
+            fingerprint.summary_id = db_summary.id
+            self.db.add(fingerprint)
+        keys = _aggregate_keys(wallet_address, article_url, provider, datetime.now(timezone.utc).date())
+        await self._increment_aggregates({key: (1, len(original_content or "")) for key in keys})
         await self.db.commit()
         await self.db.refresh(db_summary)
         return db_summary
@@ -58,6 +125,44 @@ class SummaryRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
     
+    async def stream_summaries_by_wallet(
+        self,
+        wallet_address: str,
+        include_content: bool = False,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """
+        Stream all summaries for a wallet through a server-side cursor
+
+        Rows are fetched in batches of ``batch_size`` and yielded as plain
+        mappings, so memory use does not grow with the number of rows.
+
+        Args:
+            wallet_address: The wallet address to filter by
+            include_content: Whether to include the original article content
+            batch_size: Number of rows fetched per round trip
+
+        Yields:
+            dict: One summary row at a time
+        """
+        columns = [
+            models.Summary.id,
+            models.Summary.wallet_address,
+            models.Summary.article_url,
+            models.Summary.summary_content,
+            models.Summary.created_at
+        ]
+        if include_content:
+            columns.append(models.Summary.original_content)
+
+        query = select(*columns).where(
+            models.Summary.wallet_address == wallet_address
+        ).order_by(desc(models.Summary.created_at)).execution_options(yield_per=batch_size)
+
+        result = await self.db.stream(query)
+        async for row in result.mappings():
+            yield dict(row)
+
     async def get_summary_by_id(self, summary_id: int) -> Optional[models.Summary]:
         """
         Get a summary by its ID
@@ -71,3 +176,316 @@ class SummaryRepository:
         query = select(models.Summary).where(models.Summary.id == summary_id)
         result = await self.db.execute(query)
         return result.scalars().first()
+
+    async def get_recent_requests(self, limit: int) -> List[Tuple[str, datetime]]:
+        """
+        Get the article URLs and times of the most recent summaries
+        
+        Ordered by primary key so the query walks the primary key index
+        instead of sorting the table.
+        
+        Args:
+            limit: Maximum number of rows to return
+            
+        Returns:
+            List[Tuple[str, datetime]]: (article_url, created_at) pairs, newest first
+        """
+        query = select(
+            models.Summary.article_url,
+            models.Summary.created_at
+        ).order_by(desc(models.Summary.id)).limit(limit)
+        
+        result = await self.db.execute(query)
+        return [(row.article_url, row.created_at) for row in result.all()]
+
+    async def find_near_duplicate(
+        self,
+        fingerprint: int,
+        max_distance: int,
+        provider: str,
+        model: str,
+        cache_version: str,
+        not_before: Optional[datetime] = None,
+        candidate_limit: int = 200
+    ) -> Optional[Tuple[models.Summary, int]]:
+        """
+        Find the stored summary whose article fingerprint is closest to ``fingerprint``
+
+        Candidates are the fingerprints sharing at least one band, which is
+        every fingerprint within ``max_distance`` as long as it is below
+        BAND_COUNT. Bands are probed one indexed equality query at a time,
+        newest rows first, and the lookup stops at the first band with a
+        match, so an exact repeat costs a single query. Only summaries made
+        by the given provider, model and cache version, and not older than
+        ``not_before``, are reused.
+
+        Args:
+            fingerprint: SimHash of the new article
+            max_distance: Largest Hamming distance accepted as a near duplicate
+            provider: The provider that would summarize the article now
+            model: The model that would summarize the article now
+            cache_version: The current summary cache version
+            not_before: Oldest fingerprint creation time accepted, or None for no limit
+            candidate_limit: Upper bound on candidate rows compared per band; hitting it is logged
+
+        Returns:
+            Optional[Tuple[models.Summary, int]]: The matching summary and its distance, None if no match
+        """
+        for index, value in enumerate(bands(fingerprint)):
+            query = select(
+                models.ArticleFingerprint.summary_id,
+                models.ArticleFingerprint.simhash
+            ).where(
+                getattr(models.ArticleFingerprint, f"band{index}") == value,
+                models.ArticleFingerprint.provider == provider,
+                models.ArticleFingerprint.model == model,
+                models.ArticleFingerprint.cache_version == cache_version
+            ).order_by(desc(models.ArticleFingerprint.id)).limit(candidate_limit)
+            if not_before is not None:
+                query = query.where(models.ArticleFingerprint.created_at >= not_before)
+
+            rows = (await self.db.execute(query)).all()
+            if len(rows) == candidate_limit:
+                logger.warning(
+                    f"Band {index} of fingerprint {fingerprint:016x} has at least {candidate_limit} "
+                    "candidates, only the newest were compared"
+                )
+
+            best = None
+            for summary_id, stored in rows:
+                distance = hamming_distance(fingerprint, to_unsigned(stored))
+                if distance <= max_distance and (best is None or distance < best[1]):
+                    best = (summary_id, distance)
+            if best is not None:
+                summary = await self.get_summary_by_id(best[0])
+                if summary is not None:
+                    return summary, best[1]
+        return None
+
+    async def get_cached_summary(self, cache_key: str) -> Optional[models.SummaryCacheEntry]:
+        """
+        Get a cached summary by its content hash key
+        
+        Args:
+            cache_key: The cache key built from the normalized text and provider settings
+            
+        Returns:
+            Optional[models.SummaryCacheEntry]: The cache entry if found, None otherwise
+        """
+        query = select(models.SummaryCacheEntry).where(models.SummaryCacheEntry.cache_key == cache_key)
+        result = await self.db.execute(query)
+        return result.scalars().first()
+    
+    async def store_cached_summary(
+        self,
+        cache_key: str,
+        provider: str,
+        model: str,
+        summary_content: str,
+        expires_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Store a summary in the persistent cache, replacing any existing entry
+        
+        Args:
+            cache_key: The cache key built from the normalized text and provider settings
+            provider: The provider that produced the summary
+            model: The model that produced the summary
+            summary_content: The summarized content
+            expires_at: When the entry stops being valid, or None to keep it indefinitely
+        """
+        await self.db.execute(
+            delete(models.SummaryCacheEntry).where(models.SummaryCacheEntry.cache_key == cache_key)
+        )
+        self.db.add(models.SummaryCacheEntry(
+            cache_key=cache_key,
+            provider=provider,
+            model=model,
+            summary_content=summary_content,
+            expires_at=expires_at
+        ))
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Another request stored the same key concurrently; either copy is valid
+            await self.db.rollback()
+    
+    async def delete_cached_summary(self, cache_key: str) -> None:
+        """Remove a cache entry, e.g. after it expired"""
+        await self.db.execute(
+            delete(models.SummaryCacheEntry).where(models.SummaryCacheEntry.cache_key == cache_key)
+        )
+        await self.db.commit()
+    
+    async def get_usage_aggregate(self, dimension: str, key: str = "") -> Optional[models.UsageAggregate]:
+        """
+        Get the running counters for a single aggregate key
+        
+        Args:
+            dimension: The aggregate dimension (total, wallet, domain, day or provider)
+            key: The key within the dimension
+            
+        Returns:
+            Optional[models.UsageAggregate]: The aggregate row if any summaries were counted
+        """
+        query = select(models.UsageAggregate).where(
+            models.UsageAggregate.dimension == dimension,
+            models.UsageAggregate.key == key
+        )
+        result = await self.db.execute(query)
+        return result.scalars().first()
+    
+    async def get_usage_aggregates(
+        self,
+        dimension: str,
+        keys: Optional[List[str]] = None,
+        limit: int = 10
+    ) -> List[models.UsageAggregate]:
+        """
+        Get aggregate rows of a dimension, either by key or the top ones by count
+        
+        Args:
+            dimension: The aggregate dimension
+            keys: Specific keys to fetch; when omitted the highest counts are returned
+            limit: Maximum number of rows when fetching by count
+            
+        Returns:
+            List[models.UsageAggregate]: List of aggregate rows
+        """
+        query = select(models.UsageAggregate).where(models.UsageAggregate.dimension == dimension)
+        if keys is not None:
+            query = query.where(models.UsageAggregate.key.in_(keys)).order_by(models.UsageAggregate.key)
+        else:
+            query = query.order_by(desc(models.UsageAggregate.count)).limit(limit)
+        
+        result = await self.db.execute(query)
+        return result.scalars().all()
+    
+    async def rebuild_usage_aggregates(self, batch_size: int = 1000) -> int:
+        """
+        Recompute all usage aggregates from the summaries table
+        
+        This is a one-off full scan for databases that predate the aggregates
+        table; the provider of historical rows is recorded as "unknown".
+        
+        Args:
+            batch_size: Number of rows fetched per round trip
+            
+        Returns:
+            int: The number of summaries counted
+        """
+        counters: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        query = select(
+            models.Summary.wallet_address,
+            models.Summary.article_url,
+            models.Summary.original_content,
+            models.Summary.created_at
+        ).execution_options(yield_per=batch_size)
+        
+        rows = 0
+        result = await self.db.stream(query)
+        async for row in result:
+            created = row.created_at or datetime.now(timezone.utc)
+            for key in _aggregate_keys(row.wallet_address, row.article_url, None, created.date()):
+                count, length = counters.get(key, (0, 0))
+                counters[key] = (count + 1, length + len(row.original_content or ""))
+            rows += 1
+        
+        await self.db.execute(delete(models.UsageAggregate))
+        if counters:
+            await self._increment_aggregates(counters)
+        await self.db.commit()
+        return rows
+    
+    async def backfill_article_fingerprints(
+        self,
+        provider: str,
+        model: str,
+        cache_version: str,
+        batch_size: int = 500
+    ) -> int:
+        """
+        Fingerprint stored summaries that have no article fingerprint yet
+        
+        Used once for databases that predate near-duplicate detection. Rows
+        are processed in primary key order and committed per batch. Summaries
+        do not record what produced them, so the caller names the provider and
+        model; fingerprints keep the summary's creation time so the cache TTL
+        still applies.
+        
+        Args:
+            provider: The provider that produced the stored summaries
+            model: The model that produced the stored summaries
+            cache_version: The summary cache version to file them under
+            batch_size: Number of summaries fingerprinted per transaction
+            
+        Returns:
+            int: The number of fingerprints added
+        """
+        added = 0
+        last_id = 0
+        while True:
+            query = select(
+                models.Summary.id,
+                models.Summary.original_content,
+                models.Summary.created_at
+            ).outerjoin(
+                models.ArticleFingerprint,
+                models.ArticleFingerprint.summary_id == models.Summary.id
+            ).where(
+                models.Summary.id > last_id,
+                models.ArticleFingerprint.id.is_(None)
+            ).order_by(models.Summary.id).limit(batch_size)
+            
+            rows = (await self.db.execute(query)).all()
+            if not rows:
+                return added
+            for summary_id, content, created_at in rows:
+                if content and len(content) >= NEAR_DUPLICATE_MIN_LENGTH:
+                    self.db.add(article_fingerprint(
+                        simhash(content), provider, model, cache_version,
+                        summary_id=summary_id, created_at=created_at
+                    ))
+                    added += 1
+            last_id = rows[-1][0]
+            await self.db.commit()
+    
+    async def _increment_aggregates(self, increments: Dict[Tuple[str, str], Tuple[int, int]]):
+        """Add (count, content length) increments to aggregate rows, creating them as needed"""
+        rows = [
+            {"dimension": dimension, "key": key, "count": count, "total_content_length": length}
+            for (dimension, key), (count, length) in increments.items()
+        ]
+        dialect = self.db.get_bind().dialect.name
+        
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            # Batch the rows to stay under the bound-parameter limit on rebuilds
+            for start in range(0, len(rows), 500):
+                statement = insert(models.UsageAggregate).values(rows[start:start + 500])
+                statement = statement.on_conflict_do_update(
+                    index_elements=["dimension", "key"],
+                    set_={
+                        "count": models.UsageAggregate.count + statement.excluded.count,
+                        "total_content_length": (
+                            models.UsageAggregate.total_content_length + statement.excluded.total_content_length
+                        ),
+                        "updated_at": datetime.now(timezone.utc)
+                    }
+                )
+                await self.db.execute(statement)
+            return
+        
+        # Portable fallback for databases without INSERT ... ON CONFLICT
+        for row in rows:
+            result = await self.db.execute(
+                update(models.UsageAggregate).where(
+                    models.UsageAggregate.dimension == row["dimension"],
+                    models.UsageAggregate.key == row["key"]
+                ).values(
+                    count=models.UsageAggregate.count + row["count"],
+                    total_content_length=models.UsageAggregate.total_content_length + row["total_content_length"]
+                )
+            )
+            if result.rowcount == 0:
+                self.db.add(models.UsageAggregate(**row))
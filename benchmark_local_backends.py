@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+SAMPLE_ARTICLE = (
+    "The city council approved a new transit plan on Tuesday that will add three bus rapid transit lines "
+    "and extend the light rail network by twelve kilometres over the next decade. Officials said the plan, "
+    "which is expected to cost 2.4 billion dollars, will be funded through a mix of federal grants, a new "
+    "regional sales tax and revenue from congestion pricing in the downtown core. Supporters argued the "
+    "investment is overdue, pointing to a 40 percent increase in commute times since 2015 and a growing "
+    "number of residents who cannot afford to own a car. Opponents raised concerns about construction "
+    "disruption and questioned ridership projections, noting that bus ridership fell during the pandemic "
+    "and has only partially recovered. The first bus line is scheduled to open in 2026, with rail "
+    "construction beginning the following year after environmental reviews are completed. "
+) * 3
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(backend: str, model: str, runs: int, text: str) -> dict:
+    """Load one backend in this process and time repeated summarizations"""
+    # Keep the service singleton from loading its own models during import
+    for key in ("OPENAI_API_KEY", "HUGGINGFACE_API_KEY", "LOCAL_BACKEND"):
+        os.environ[key] = ""
+    from app.services.summarizer_service import create_local_pipeline, LOCAL_SUMMARY_MAX_LENGTH, LOCAL_SUMMARY_MIN_LENGTH
+
+    rss_before = _peak_rss_mb()
+    started = time.perf_counter()
+    summarize = create_local_pipeline(backend, model)
+    load_seconds = time.perf_counter() - started
+
+    def call():
+        return summarize(
+            text,
+            max_length=LOCAL_SUMMARY_MAX_LENGTH,
+            min_length=LOCAL_SUMMARY_MIN_LENGTH,
+            do_sample=False,
+            truncation=True
+        )[0]["summary_text"]
+
+    # Warm-up run (graph optimization, allocator growth) is not timed
+    summary = call()
+
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+
+    ordered = sorted(latencies)
+    return {
+        "backend": backend,
+        "model": model,
+        "runs": runs,
+        "load_seconds": round(load_seconds, 2),
+        "latency_p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "latency_p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+        "throughput_per_second": round(runs / sum(latencies), 3),
+        "model_memory_mb": round(_peak_rss_mb() - rss_before, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "summary_preview": summary[:120]
+    }
+
+
+def benchmark(backends, model: str, runs: int, text: str):
+    """Run each backend in a fresh process so memory numbers are not mixed"""
+    results = []
+    for backend in backends:
+        print(f"Benchmarking {backend} backend with {model} ({runs} runs)...")
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--model", model, "--runs", str(runs)],
+            input=text, capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"  {backend} failed:\n{output.stderr.strip()[-2000:]}")
+            continue
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    if not results:
+        return
+
+    try:
+        from prettytable import PrettyTable
+    except ImportError:
+        print(json.dumps(results, indent=2))
+        return
+
+    pt = PrettyTable()
+    pt.field_names = ["backend", "load s", "p50 ms", "p95 ms", "articles/s", "model MB", "peak RSS MB"]
+    for r in results:
+        pt.add_row([
+            r["backend"], r["load_seconds"], r["latency_p50_ms"], r["latency_p95_ms"],
+            r["throughput_per_second"], r["model_memory_mb"], r["peak_rss_mb"]
+        ])
+    print(pt)
+    for r in results:
+        print(f"{r['backend']}: {r['summary_preview']}...")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare local summarization backends on CPU")
+    parser.add_argument("--model", default=os.getenv("HUGGINGFACE_MODEL", "facebook/bart-large-cnn"))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--backends", default="pytorch,onnx", help="Comma-separated list of backends")
+    parser.add_argument("--file", help="Article text file to summarize (defaults to a built-in sample)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.model, args.runs, sys.stdin.read())))
+    else:
+        text = open(args.file).read() if args.file else SAMPLE_ARTICLE
+        benchmark(args.backends.split(","), args.model, args.runs, text)
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.deadline import Deadline, DeadlineExceeded
+
+
+class TestDeadline:
+
+    def test_from_header_uses_header_value(self):
+        deadline = Deadline.from_header("12.5")
+        assert deadline.budget == 12.5
+        assert 0 < deadline.remaining() <= 12.5
+
+    def test_from_header_rejects_invalid_values(self):
+        with pytest.raises(HTTPException) as exc:
+            Deadline.from_header("soon")
+        assert exc.value.status_code == 400
+
+    def test_run_cancels_work_past_the_deadline(self):
+        deadline = Deadline(0.6)
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with pytest.raises(DeadlineExceeded) as exc:
+            asyncio.run(deadline.run(slow(), "summarization"))
+        assert exc.value.status_code == 504
+        assert cancelled == [True]
+
+    def test_timeout_is_capped_by_remaining_budget(self):
+        deadline = Deadline(2.0)
+        assert deadline.timeout(60) <= 2.0
+        assert deadline.timeout(0.1) == 0.1
@@ -0,0 +1,94 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import export_service
+from app.services.export_service import gzip_stream, _format_csv, _format_ndjson
+from app.services.summary_repository import SummaryRepository
+
+
+async def _chunks():
+    for i in range(3):
+        yield f"line {i}\n".encode("utf-8")
+
+
+async def _collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestExportFormatting:
+
+    def test_csv_row_is_quoted(self):
+        row = {"id": 1, "summary_content": 'a, "quoted" summary'}
+        assert _format_csv(row, ["id", "summary_content"]) == '1,"a, ""quoted"" summary"\r\n'
+
+    def test_ndjson_row_is_one_line(self):
+        line = _format_ndjson({"id": 1, "summary_content": "two\nlines"}, ["id", "summary_content"])
+        assert line.count("\n") == 1 and line.endswith("\n")
+
+    def test_gzip_stream_round_trip(self):
+        compressed = asyncio.run(_collect(gzip_stream(_chunks())))
+        assert gzip.decompress(compressed) == b"line 0\nline 1\nline 2\n"
+
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+def _seed(sessions):
+    async def seed():
+        async with sessions() as db:
+            repository = SummaryRepository(db)
+            for i in range(3):
+                await repository.create_summary(WALLET, f"https://example.com/{i}", f"content {i}", f"summary {i}")
+            await repository.create_summary("0xother", "https://example.com/x", "other", "other summary")
+    asyncio.run(seed())
+
+
+class TestExportFromDatabase:
+
+    def test_stream_yields_only_the_wallets_rows(self, sqlite_sessions):
+        _seed(sqlite_sessions)
+
+        async def stream(include_content):
+            async with sqlite_sessions() as db:
+                return [row async for row in SummaryRepository(db).stream_summaries_by_wallet(
+                    WALLET, include_content=include_content, batch_size=2
+                )]
+
+        rows = asyncio.run(stream(False))
+        assert sorted(row["article_url"] for row in rows) == [f"https://example.com/{i}" for i in range(3)]
+        assert "original_content" not in rows[0]
+        assert "original_content" in asyncio.run(stream(True))[0]
+
+    def test_csv_export_has_header_and_rows(self, sqlite_sessions, monkeypatch):
+        _seed(sqlite_sessions)
+        monkeypatch.setattr(export_service, "SessionLocal", sqlite_sessions)
+
+        body = asyncio.run(_collect(export_service.export_summaries(WALLET, "csv", include_content=True)))
+        rows = list(csv.reader(io.StringIO(body.decode("utf-8"))))
+        assert rows[0] == export_service.EXPORT_FIELDS + ["original_content"]
+        assert len(rows) == 4
+        assert {row[2] for row in rows[1:]} == {f"https://example.com/{i}" for i in range(3)}
+
+    def test_ndjson_export_route(self, sqlite_sessions, monkeypatch):
+        _seed(sqlite_sessions)
+        monkeypatch.setattr(export_service, "SessionLocal", sqlite_sessions)
+
+        response = TestClient(app).get(f"/api/summaries/{WALLET}/export", params={"format": "ndjson", "gzip": "true"})
+        # The test client decodes Content-Encoding: gzip transparently
+        lines = response.text.splitlines()
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" not in response.headers.get("vary", "")
+        assert {json.loads(line)["summary_content"] for line in lines} == {f"summary {i}" for i in range(3)}
+
+    def test_content_disposition_filename_is_sanitized(self, sqlite_sessions, monkeypatch):
+        monkeypatch.setattr(export_service, "SessionLocal", sqlite_sessions)
+
+        response = TestClient(app).get('/api/summaries/a"b;c/export')
+        assert response.headers["content-disposition"] == 'attachment; filename="summaries-a_b_c.ndjson"'
@@ -0,0 +1,187 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import httpx
+
+from app import models
+from app.services import feed_service
+from app.services.feed_service import FeedEntry, FeedScheduler, parse_feed, select_new_entries
+
+RSS_FEED = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Example</title>
+<item><link>https://example.com/a</link><pubDate>Mon, 06 May 2024 10:00:00 GMT</pubDate></item>
+<item><link>https://example.com/b</link><pubDate>Tue, 07 May 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+ATOM_FEED = """<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<entry><link rel="alternate" href="https://example.com/c"/><updated>2024-05-08T10:00:00Z</updated></entry>
+</feed>"""
+
+SITEMAP_INDEX = """<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>https://example.com/sitemap-1.xml</loc><lastmod>2024-05-08</lastmod></sitemap>
+</sitemapindex>"""
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestParseFeed:
+
+    def test_rss(self):
+        parsed = parse_feed(RSS_FEED)
+        assert parsed.feed_type == "rss"
+        assert [e.url for e in parsed.entries] == ["https://example.com/a", "https://example.com/b"]
+        assert parsed.entries[1].published == _utc(2024, 5, 7, 10)
+
+    def test_atom(self):
+        parsed = parse_feed(ATOM_FEED)
+        assert parsed.feed_type == "atom"
+        assert parsed.entries == [FeedEntry("https://example.com/c", _utc(2024, 5, 8, 10))]
+
+    def test_sitemap_index(self):
+        parsed = parse_feed(SITEMAP_INDEX)
+        assert parsed.feed_type == "sitemap"
+        assert parsed.entries == []
+        assert parsed.sitemaps[0].url == "https://example.com/sitemap-1.xml"
+
+
+class TestSelectNewEntries:
+
+    def test_only_entries_past_watermark(self):
+        entries = [
+            FeedEntry("https://example.com/new", _utc(2024, 5, 9)),
+            FeedEntry("https://example.com/old", _utc(2024, 5, 1)),
+            FeedEntry("https://example.com/undated", None),
+        ]
+        selected = select_new_entries(entries, _utc(2024, 5, 5), limit=10)
+        assert [e.url for e in selected] == ["https://example.com/new", "https://example.com/undated"]
+
+    def test_limit_keeps_oldest_first(self):
+        entries = [FeedEntry(f"https://example.com/{day}", _utc(2024, 5, day)) for day in range(1, 6)]
+        selected = select_new_entries(entries, _utc(2024, 4, 30), limit=2)
+        assert [e.url for e in selected] == ["https://example.com/1", "https://example.com/2"]
+
+    def test_known_entries_do_not_fill_the_limit(self):
+        entries = [FeedEntry(f"https://example.com/old-{i}", None) for i in range(30)]
+        entries.append(FeedEntry("https://example.com/new", _utc(2024, 5, 9)))
+        known = {f"https://example.com/old-{i}" for i in range(30)}
+        selected = select_new_entries(entries, _utc(2024, 5, 5), limit=10, known=known)
+        assert [e.url for e in selected] == ["https://example.com/new"]
+
+    def test_prepended_undated_item_is_picked(self):
+        # Undated RSS feeds list the newest item first
+        entries = [FeedEntry(f"https://example.com/{i}", None) for i in range(20)]
+        known = {f"https://example.com/{i}" for i in range(1, 20)}
+        assert [e.url for e in select_new_entries(entries, None, limit=25, known=known)] == ["https://example.com/0"]
+        assert [e.url for e in select_new_entries(entries, _utc(2024, 5, 5), limit=25, known=known)] == ["https://example.com/0"]
+
+    def test_first_poll_takes_newest_undated_entries(self):
+        entries = [FeedEntry(f"https://example.com/{i}", None) for i in range(20)]
+        selected = select_new_entries(entries, None, limit=25)
+        assert [e.url for e in selected][-1] == "https://example.com/0"
+        assert "https://example.com/19" not in {e.url for e in selected}
+
+
+def _rss(urls_and_dates):
+    items = "".join(
+        f"<item><link>{url}</link>" + (f"<pubDate>{format_datetime(date)}</pubDate>" if date else "") + "</item>"
+        for url, date in urls_and_dates
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.hosts = []
+
+    @asynccontextmanager
+    async def slot(self, host, delay=None, deadline=None):
+        self.hosts.append(host)
+        yield
+
+
+class TestPollFeed:
+
+    def _poller(self, sessions, monkeypatch, document, last_seen_at=None, etag='"v1"'):
+        requests = []
+        summarized = []
+        documents = [document]
+
+        def handler(request):
+            requests.append(request)
+            if etag and request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304)
+            return httpx.Response(200, text=documents[-1], headers={"ETag": etag} if etag else {})
+
+        async def summarize_entry(db, feed, entry):
+            summarized.append(entry.url)
+            return True
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(feed_service, "_get_client", lambda: client)
+        monkeypatch.setattr(feed_service, "host_scheduler", RecordingScheduler())
+        scheduler = FeedScheduler()
+        monkeypatch.setattr(scheduler, "_summarize_entry", summarize_entry)
+
+        async def create():
+            async with sessions() as db:
+                feed = models.Feed(
+                    wallet_address="0xaaa", feed_url="https://example.com/feed",
+                    poll_interval_seconds=60, last_seen_at=last_seen_at
+                )
+                db.add(feed)
+                await db.commit()
+                return feed.id
+        feed_id = asyncio.run(create())
+
+        def poll():
+            async def run():
+                async with sessions() as db:
+                    feed = await db.get(models.Feed, feed_id)
+                    return await scheduler.poll_feed(db, feed), feed.etag
+            return asyncio.run(run())
+
+        return poll, requests, summarized, documents
+
+    def test_left_over_entries_are_polled_despite_the_etag(self, sqlite_sessions, monkeypatch):
+        monkeypatch.setattr(feed_service, "FEED_MAX_ITEMS_PER_POLL", 2)
+        document = _rss([(f"https://example.com/{day}", _utc(2024, 5, day)) for day in range(1, 6)])
+        poll, requests, summarized, _ = self._poller(sqlite_sessions, monkeypatch, document, _utc(2024, 4, 30))
+
+        assert poll() == (2, None)
+        assert poll() == (2, None)
+        assert poll() == (1, '"v1"')
+        assert poll() == (0, '"v1"')
+        assert requests[-1].headers["If-None-Match"] == '"v1"'
+        assert summarized == [f"https://example.com/{day}" for day in range(1, 6)]
+
+    def test_unchanged_undated_feed_selects_nothing_twice(self, sqlite_sessions, monkeypatch):
+        urls = [f"https://example.com/u{i}" for i in range(50)]
+        poll, _, summarized, documents = self._poller(
+            sqlite_sessions, monkeypatch, _rss([(url, None) for url in urls]), etag=None
+        )
+
+        assert poll()[0] == feed_service.FEED_INITIAL_ITEMS
+        assert set(summarized) == set(urls[:feed_service.FEED_INITIAL_ITEMS])
+        assert poll()[0] == 0
+
+        documents.append(_rss([("https://example.com/fresh", None)] + [(url, None) for url in urls]))
+        assert poll()[0] == 1
+        assert summarized[-1] == "https://example.com/fresh"
+
+    def test_feed_and_child_sitemaps_go_through_the_host_scheduler(self, sqlite_sessions, monkeypatch):
+        index = (
+            '<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            '<sitemap><loc>https://cdn.example.org/sitemap-1.xml</loc></sitemap></sitemapindex>'
+        )
+        poll, requests, _, _ = self._poller(sqlite_sessions, monkeypatch, index, etag=None)
+        poll()
+        assert [str(request.url) for request in requests] == [
+            "https://example.com/feed", "https://cdn.example.org/sitemap-1.xml"
+        ]
+        assert feed_service.host_scheduler.hosts == ["example.com", "cdn.example.org"]
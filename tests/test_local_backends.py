@@ -0,0 +1,28 @@
+import pytest
+
+from app.services import onnx_backend, summarizer_service
+from app.services.summarizer_service import create_local_pipeline
+
+
+class TestCreateLocalPipeline:
+
+    def test_unknown_backend_is_rejected(self):
+        with pytest.raises(ValueError) as exc:
+            create_local_pipeline("tensorrt")
+        assert "pytorch" in str(exc.value) and "onnx" in str(exc.value)
+
+    def test_onnx_without_optional_dependencies_raises(self, monkeypatch):
+        monkeypatch.setattr(onnx_backend, "ONNX_AVAILABLE", False)
+        with pytest.raises(RuntimeError) as exc:
+            create_local_pipeline("onnx", "facebook/bart-large-cnn")
+        assert "optimum[onnxruntime]" in str(exc.value)
+
+    def test_both_backends_default_to_the_configured_model(self, monkeypatch):
+        loaded = []
+        monkeypatch.setattr(summarizer_service, "HF_MODEL", "org/model")
+        monkeypatch.setattr(summarizer_service, "pipeline", lambda task, model: loaded.append(("pytorch", model)))
+        monkeypatch.setattr(summarizer_service, "create_onnx_pipeline", lambda model: loaded.append(("onnx", model)))
+
+        create_local_pipeline("pytorch")
+        create_local_pipeline("onnx")
+        assert loaded == [("pytorch", "org/model"), ("onnx", "org/model")]
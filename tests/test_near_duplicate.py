@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app import models
+from app.services import feed_service, summarizer_service, summary_cache
+from app.services.feed_service import FeedEntry, FeedScheduler
+from app.services.summary_repository import SummaryRepository, article_fingerprint
+from app.services.near_duplicate import (
+    BAND_COUNT, bands, hamming_distance, simhash, to_signed, to_unsigned
+)
+
+ARTICLE = (
+    "The city council approved a new transit plan on Tuesday that will add three bus rapid transit lines "
+    "and extend the light rail network by twelve kilometres over the next decade. Officials said the plan "
+    "will be funded through federal grants, a regional sales tax and congestion pricing downtown. "
+    "Opponents raised concerns about construction disruption and questioned ridership projections."
+)
+
+OTHER_ARTICLE = (
+    "Shares of the chip maker fell sharply after it cut its revenue forecast, citing weaker demand from "
+    "data centre customers and rising inventory levels across the industry. Analysts expect margins to "
+    "remain under pressure until the second half of the year as competitors lower their prices."
+)
+
+
+class TestSimHash:
+
+    def test_formatting_changes_keep_the_fingerprint(self):
+        reformatted = ARTICLE.upper().replace(". ", ".\n\n")
+        assert simhash(ARTICLE) == simhash(reformatted)
+
+    def test_unrelated_articles_are_far_apart(self):
+        assert hamming_distance(simhash(ARTICLE), simhash(OTHER_ARTICLE)) > 10
+
+    def test_matches_the_bitwise_majority_vote(self):
+        def reference(text):
+            words = text.lower().split()
+            shingles = [" ".join(words[i:i + 2]) for i in range(len(words) - 1)] or [" ".join(words)]
+            counts = [0] * 64
+            for shingle in shingles:
+                value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+                for bit in range(64):
+                    counts[bit] += 1 if value >> bit & 1 else -1
+            return sum(1 << bit for bit in range(64) if counts[bit] > 0)
+
+        rng = random.Random(7)
+        vocabulary = [f"word{i}" for i in range(50)]
+        texts = ["", "single"] + [" ".join(rng.choices(vocabulary, k=n)) for n in (2, 3, 40, 41, 500)]
+        for text in texts:
+            assert simhash(text) == reference(text)
+
+    def test_signed_storage_round_trips(self):
+        for fingerprint in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            assert -(1 << 63) <= to_signed(fingerprint) < 1 << 63
+            assert to_unsigned(to_signed(fingerprint)) == fingerprint
+
+
+class TestBands:
+
+    def test_bands_reassemble_the_fingerprint(self):
+        fingerprint = simhash(ARTICLE)
+        parts = bands(fingerprint)
+        assert len(parts) == BAND_COUNT
+        assert sum(part << (16 * i) for i, part in enumerate(parts)) == fingerprint
+
+    def test_close_fingerprints_share_a_band(self):
+        fingerprint = simhash(ARTICLE)
+        # Flip one bit in three different bands; the fourth must still match
+        near = fingerprint ^ (1 << 3) ^ (1 << 20) ^ (1 << 40)
+        assert hamming_distance(fingerprint, near) == 3
+        assert any(a == b for a, b in zip(bands(fingerprint), bands(near)))
+
+
+def _fingerprint_count(sessions):
+    async def count():
+        async with sessions() as db:
+            result = await db.execute(select(func.count()).select_from(models.ArticleFingerprint))
+            return result.scalar()
+    return asyncio.run(count())
+
+
+class TestFingerprintStorage:
+
+    def _summarize_entry(self, sessions, monkeypatch, tier, cached=None):
+        async def scrape(url):
+            return ARTICLE
+
+        async def get_cached_summary(text):
+            return cached
+
+        async def summarize(text, check_cache=True):
+            summarizer_service._summary_tier.set(tier)
+            return "summary"
+
+        monkeypatch.setattr(feed_service, "scrape_article", scrape)
+        monkeypatch.setattr(feed_service.summarizer, "get_cached_summary", get_cached_summary)
+        monkeypatch.setattr(feed_service.summarizer, "summarize_text", summarize)
+        feed = models.Feed(wallet_address="0xaaa", feed_url="https://example.com/feed", poll_interval_seconds=60)
+
+        async def run():
+            async with sessions() as db:
+                return await FeedScheduler()._summarize_entry(db, feed, FeedEntry("https://example.com/a", None))
+        assert asyncio.run(run())
+
+    def test_full_summary_is_fingerprinted(self, sqlite_sessions, monkeypatch):
+        self._summarize_entry(sqlite_sessions, monkeypatch, "full")
+        assert _fingerprint_count(sqlite_sessions) == 1
+
+    def test_degraded_summary_is_not_fingerprinted(self, sqlite_sessions, monkeypatch):
+        self._summarize_entry(sqlite_sessions, monkeypatch, "fast_model")
+        assert _fingerprint_count(sqlite_sessions) == 0
+
+    def test_exact_cache_hit_skips_fingerprinting(self, sqlite_sessions, monkeypatch):
+        def fail(text):
+            raise AssertionError("simhash computed on an exact cache hit")
+
+        monkeypatch.setattr(summary_cache, "simhash", fail)
+        self._summarize_entry(sqlite_sessions, monkeypatch, "cache", cached="cached summary")
+        assert _fingerprint_count(sqlite_sessions) == 0
+
+
+def _store(sessions, content, provider="openai", model="gpt-3.5-turbo", cache_version="1"):
+    async def store():
+        async with sessions() as db:
+            row = article_fingerprint(simhash(content), provider, model, cache_version)
+            summary = await SummaryRepository(db).create_summary(
+                "0xaaa", "https://example.com/a", content, f"summary of {content[:20]}", fingerprint=row
+            )
+            return summary.id
+    return asyncio.run(store())
+
+
+def _lookup(sessions, content, provider="openai", model="gpt-3.5-turbo", cache_version="1", not_before=None):
+    async def lookup():
+        async with sessions() as db:
+            match = await SummaryRepository(db).find_near_duplicate(
+                simhash(content), 3, provider, model, cache_version, not_before
+            )
+            return None if match is None else (match[0].id, match[1])
+    return asyncio.run(lookup())
+
+
+class TestFindNearDuplicate:
+
+    def test_exact_repeat_matches(self, sqlite_sessions):
+        summary_id = _store(sqlite_sessions, ARTICLE)
+        assert _lookup(sqlite_sessions, ARTICLE) == (summary_id, 0)
+        assert _lookup(sqlite_sessions, OTHER_ARTICLE) is None
+
+    def test_other_configurations_are_not_reused(self, sqlite_sessions):
+        _store(sqlite_sessions, ARTICLE)
+        assert _lookup(sqlite_sessions, ARTICLE, provider="huggingface") is None
+        assert _lookup(sqlite_sessions, ARTICLE, model="gpt-4") is None
+        assert _lookup(sqlite_sessions, ARTICLE, cache_version="2") is None
+
+    def test_expired_fingerprints_are_not_reused(self, sqlite_sessions):
+        _store(sqlite_sessions, ARTICLE)
+        assert _lookup(sqlite_sessions, ARTICLE, not_before=datetime.now(timezone.utc) - timedelta(hours=1))
+        assert _lookup(sqlite_sessions, ARTICLE, not_before=datetime.now(timezone.utc) + timedelta(hours=1)) is None
+
+    def test_crowded_band_does_not_hide_the_match(self, sqlite_sessions, caplog):
+        query = 0x0123456789ABCDEF
+        near = query ^ 0b11  # Differs in band 0 only
+        crowd = [query ^ (0xFFFF << 16) ^ (0xFFFF << 48) ^ i << 32 for i in range(5)]  # Share band 0 only
+
+        async def run():
+            async with sqlite_sessions() as db:
+                repository = SummaryRepository(db)
+                for value in [near] + crowd:
+                    await repository.create_summary(
+                        "0xaaa", "https://example.com/a", "content", f"{value:016x}",
+                        fingerprint=article_fingerprint(value, "openai", "gpt-3.5-turbo", "1")
+                    )
+                match = await repository.find_near_duplicate(
+                    query, 3, "openai", "gpt-3.5-turbo", "1", candidate_limit=3
+                )
+                return match[0].summary_content, match[1]
+
+        assert asyncio.run(run()) == (f"{near:016x}", 2)
+        assert "only the newest were compared" in caplog.text
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.services import prefetch_service, summarizer_service
+from app.services.cpu_accounting import charge_cpu
+from app.services.prefetch_service import PrefetchedArticle, Prefetcher, score_history
+
+
+class TestScoreHistory:
+
+    def test_recent_requests_outweigh_old_ones(self):
+        now = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+        rows = [
+            ("https://news.example.com/fresh", now - timedelta(minutes=5)),
+            ("https://news.example.com/fresh", now - timedelta(minutes=10)),
+            ("https://www.blog.example.org/old", now - timedelta(hours=10)),
+            ("https://www.blog.example.org/old", now - timedelta(hours=11)),
+            ("https://www.blog.example.org/old", now - timedelta(hours=12)),
+        ]
+        url_scores, domain_scores = score_history(rows, now, half_life=3600)
+
+        assert url_scores["https://news.example.com/fresh"] > 1.8
+        assert url_scores["https://www.blog.example.org/old"] < 0.01
+        assert set(domain_scores) == {"news.example.com", "blog.example.org"}
+
+    def test_one_half_life_halves_the_weight(self):
+        now = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+        url_scores, _ = score_history([("https://a.com/x", now - timedelta(hours=1))], now, half_life=3600)
+        assert abs(url_scores["https://a.com/x"] - 0.5) < 1e-9
+
+
+class TestPrefetchAccounting:
+
+    def _prefetcher(self):
+        prefetcher = Prefetcher()
+        prefetcher.enabled = True
+        return prefetcher
+
+    def test_served_entries_count_as_hits(self):
+        prefetcher = self._prefetcher()
+        prefetcher._articles["https://a.com/x"] = PrefetchedArticle("text", cpu_seconds=0.2, summarizations=1)
+
+        assert prefetcher.take("https://a.com/x") == "text"
+        assert prefetcher.take("https://a.com/x") == "text"
+        assert prefetcher.take("https://a.com/y") is None
+
+        stats = prefetcher.stats()
+        assert stats["hits"] == 2
+        assert stats["lookups"] == 3
+        assert stats["used"] == 1
+        assert stats["wasted"] == 0
+
+    def test_expired_unused_entries_count_as_waste(self, monkeypatch):
+        prefetcher = self._prefetcher()
+        prefetcher._articles["https://a.com/x"] = PrefetchedArticle("text", cpu_seconds=0.5, summarizations=1)
+        monkeypatch.setattr(prefetch_service, "PREFETCH_CONTENT_TTL", -1)
+
+        prefetcher._prune()
+
+        stats = prefetcher.stats()
+        assert stats["entries"] == 0
+        assert stats["wasted"] == 1
+        assert stats["wasted_summarizations"] == 1
+        assert stats["wasted_cpu_seconds"] == 0.5
+
+    def test_summarization_budget_is_per_rolling_hour(self, monkeypatch):
+        prefetcher = self._prefetcher()
+        monkeypatch.setattr(prefetch_service, "PREFETCH_MAX_SUMMARIES_PER_HOUR", 2)
+        now = prefetch_service.time.monotonic()
+        prefetcher._summarizations.extend([now - 4000, now - 10])
+        assert prefetcher._summarization_budget_left()
+
+        prefetcher._summarizations.append(now)
+        assert not prefetcher._summarization_budget_left()
+
+    def test_disabled_prefetcher_is_never_consulted(self):
+        prefetcher = Prefetcher()
+        prefetcher.enabled = False
+        prefetcher._articles["https://a.com/x"] = PrefetchedArticle("text", cpu_seconds=0.0, summarizations=0)
+        assert prefetcher.take("https://a.com/x") is None
+        assert prefetcher.stats()["lookups"] == 0
+
+
+def _burn(seconds):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class TestPrefetch:
+
+    def _run(self, monkeypatch, tier, scrape_work=0.0, other_work=0.0, inference_work=0.0):
+        async def scrape(url, max_retries=3):
+            _burn(other_work)  # e.g. another request running on the event loop
+            with charge_cpu():
+                _burn(scrape_work)
+            return "article text"
+
+        async def summarize(text):
+            def inference():
+                with charge_cpu():
+                    _burn(inference_work)
+            await asyncio.to_thread(inference)
+            summarizer_service._summary_tier.set(tier)
+            summarizer_service._used_fallback.set(False)
+            return "summary"
+
+        monkeypatch.setattr(prefetch_service, "scrape_article", scrape)
+        monkeypatch.setattr(prefetch_service.summarizer, "summarize_text", summarize)
+        monkeypatch.setattr(prefetch_service, "PREFETCH_CPU_BUDGET", 0)
+        prefetcher = Prefetcher()
+        prefetcher.enabled = True
+        return prefetcher, asyncio.run(prefetcher.prefetch("https://a.com/x"))
+
+    def test_only_the_prefetch_work_is_charged(self, monkeypatch):
+        prefetcher, warm = self._run(monkeypatch, "full", scrape_work=0.05, other_work=0.2, inference_work=0.05)
+        assert warm
+        assert 0.09 <= prefetcher.stats()["cpu_seconds"] < 0.2
+
+    def test_fallback_summary_is_not_kept(self, monkeypatch):
+        prefetcher, warm = self._run(monkeypatch, "extractive")
+        stats = prefetcher.stats()
+        assert not warm
+        assert stats["entries"] == 0
+        assert stats["wasted"] == 1
+        assert stats["wasted_summarizations"] == 1
@@ -0,0 +1,49 @@
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import profiling_service
+from app.services.profiling_service import ProfilingMiddleware, profiler
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/work")
+    def work():
+        # Sync endpoint: runs in the threadpool while the loop thread is sampled
+        time.sleep(0.05)
+        return {"ok": True}
+
+    return app
+
+
+class TestProfilingMiddleware:
+
+    def _enable(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(profiling_service, "PROFILE_TOKEN", "secret")
+        monkeypatch.setattr(profiling_service, "PROFILE_DIR", str(tmp_path))
+        monkeypatch.setattr(profiler, "enabled", True)
+
+    def test_token_request_is_profiled_and_written(self, monkeypatch, tmp_path):
+        self._enable(monkeypatch, tmp_path)
+
+        response = TestClient(_app()).get("/work", headers={"X-Profile-Token": "secret"})
+        profile_id = response.headers["x-profile-id"]
+
+        assert (tmp_path / f"{profile_id}.collapsed").exists()
+        metadata = json.loads((tmp_path / f"{profile_id}.json").read_text())
+        assert metadata["path"] == "/work"
+        assert metadata["status_code"] == 200
+        assert metadata["duration_ms"] >= 50
+
+    def test_wrong_or_missing_token_is_not_profiled(self, monkeypatch, tmp_path):
+        self._enable(monkeypatch, tmp_path)
+        client = TestClient(_app())
+
+        assert "x-profile-id" not in client.get("/work", headers={"X-Profile-Token": "wrong"}).headers
+        assert "x-profile-id" not in client.get("/work").headers
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,55 @@
+import asyncio
+
+from app.services.provider_clients import ProviderClients
+
+
+async def _serve_keep_alive(reader, writer):
+    # Minimal HTTP/1.1 server: answers every request on the same connection
+    try:
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            if not request:
+                break
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _send_requests(count):
+    server = await asyncio.start_server(_serve_keep_alive, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    clients = ProviderClients()
+    client = clients._http_client("huggingface")
+    try:
+        for _ in range(count):
+            response = await client.get(f"http://127.0.0.1:{port}/")
+            assert response.text == "ok"
+    finally:
+        await client.aclose()
+        server.close()
+        await server.wait_closed()
+    return clients.metrics()["huggingface"]
+
+
+class TestConnectionMetrics:
+
+    def test_sequential_requests_reuse_one_connection(self):
+        metrics = asyncio.run(_send_requests(2))
+        assert metrics["requests"] == 2
+        assert metrics["connections_opened"] == 1
+        # Plain HTTP: no TLS handshake is traced
+        assert metrics["tls_handshakes"] == 0
+        assert metrics["reused_connections"] == 1
+        assert metrics["reuse_ratio"] == 0.5
+
+    def test_empty_metrics(self):
+        assert ProviderClients().metrics()["openai"] == {
+            "requests": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+            "reused_connections": 0,
+            "reuse_ratio": 0.0
+        }
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import scraper_service
+from app.services.scraper_service import HostScheduler, RobotsCache, _CachedDNSBackend
+
+
+async def _timed_starts(scheduler, hosts):
+    starts = {}
+
+    async def fetch(index, host):
+        async with scheduler.slot(host):
+            starts[index] = time.monotonic()
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(fetch(i, host) for i, host in enumerate(hosts)))
+    return [starts[i] for i in range(len(hosts))]
+
+
+class TestHostScheduler:
+
+    def test_same_host_requests_are_spaced(self):
+        scheduler = HostScheduler(concurrency=2, min_delay=0.1)
+        starts = asyncio.run(_timed_starts(scheduler, ["a.com", "a.com", "a.com"]))
+        gaps = [later - earlier for earlier, later in zip(sorted(starts), sorted(starts)[1:])]
+        assert all(gap >= 0.09 for gap in gaps)
+
+    def test_different_hosts_run_in_parallel(self):
+        scheduler = HostScheduler(concurrency=1, min_delay=0.5)
+        starts = asyncio.run(_timed_starts(scheduler, ["a.com", "b.com", "c.com"]))
+        assert max(starts) - min(starts) < 0.1
+
+    def test_crawl_delay_overrides_shorter_minimum(self):
+        scheduler = HostScheduler(concurrency=1, min_delay=0.0)
+
+        async def run():
+            async with scheduler.slot("a.com", delay=0.1):
+                pass
+            began = time.monotonic()
+            async with scheduler.slot("a.com"):
+                return time.monotonic() - began
+
+        assert asyncio.run(run()) >= 0.09
+
+    def test_slot_fails_fast_when_delay_exceeds_deadline(self):
+        from app.services.deadline import Deadline, DeadlineExceeded
+        scheduler = HostScheduler(concurrency=1, min_delay=5.0)
+
+        async def run():
+            async with scheduler.slot("a.com"):
+                pass
+            async with scheduler.slot("a.com", deadline=Deadline(1.0)):
+                pass
+
+        began = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(run())
+        assert time.monotonic() - began < 0.5
+
+    def test_idle_hosts_are_forgotten(self, monkeypatch):
+        monkeypatch.setattr(scraper_service, "STATE_SWEEP_INTERVAL", 0.0)
+        scheduler = HostScheduler(concurrency=1, min_delay=0.0)
+
+        async def run():
+            for host in ("a.com", "b.com", "c.com"):
+                async with scheduler.slot(host):
+                    pass
+            async with scheduler.slot("d.com"):
+                return set(scheduler._semaphores)
+
+        assert asyncio.run(run()) == {"d.com"}
+
+
+def _robots(status_code, text=""):
+    async def fetch():
+        transport = httpx.MockTransport(lambda request: httpx.Response(status_code, text=text))
+        async with httpx.AsyncClient(transport=transport) as client:
+            cache = RobotsCache(ttl=3600, error_ttl=300)
+            return await cache.get(client, "https://example.com")
+    return asyncio.run(fetch())
+
+
+class TestRobotsCache:
+
+    def test_server_error_disallows(self):
+        assert not _robots(503).can_fetch("Web3ArticleSummarizer", "https://example.com/article")
+
+    def test_missing_robots_allows(self):
+        assert _robots(404).can_fetch("Web3ArticleSummarizer", "https://example.com/article")
+
+    def test_rules_are_applied(self):
+        robots = _robots(200, "User-agent: *\nDisallow: /private\n")
+        assert robots.can_fetch("Web3ArticleSummarizer", "https://example.com/article")
+        assert not robots.can_fetch("Web3ArticleSummarizer", "https://example.com/private/x")
+
+
+class TestCachedDNSBackend:
+
+    def test_empty_resolution_falls_back_to_the_host(self):
+        connected = []
+
+        class Backend:
+            async def connect_tcp(self, host, port, **kwargs):
+                connected.append(host)
+                return "stream"
+
+        class EmptyCache:
+            async def resolve(self, host, port):
+                return []
+
+        backend = _CachedDNSBackend(Backend(), EmptyCache())
+        assert asyncio.run(backend.connect_tcp("example.com", 443)) == "stream"
+        assert connected == ["example.com"]
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services import summarizer_service
+from app.services.deadline import Deadline, DeadlineExceeded
+from app.services.summarizer_service import SummarizerService, get_summary_tier
+
+# Many sentences, so the extractive summary differs from the input
+ARTICLE = ". ".join(f"Sentence number {i} of the article" for i in range(200))
+
+
+class _NoCache:
+    def __init__(self):
+        self.stored = []
+
+    async def get(self, key):
+        return None
+
+    async def put(self, key, provider, model, summary):
+        self.stored.append(summary)
+
+
+def _huggingface_service(monkeypatch, status_code=503, local_pipeline=None):
+    transport = httpx.MockTransport(lambda request: httpx.Response(status_code, json={"error": "loading"}))
+    monkeypatch.setattr(summarizer_service.provider_clients, "huggingface_client",
+                        lambda: httpx.AsyncClient(transport=transport))
+    cache = _NoCache()
+    monkeypatch.setattr(summarizer_service, "summary_cache", cache)
+
+    service = SummarizerService.__new__(SummarizerService)
+    service.service_type = "huggingface"
+    service.model_name = "facebook/bart-large-cnn"
+    service.hf_headers = {}
+    service.has_local_fallback = local_pipeline is not None
+    service.local_pipeline = local_pipeline
+    return service, cache
+
+
+def _summarize(service, deadline=None):
+    async def run():
+        summary = await service.summarize_text(ARTICLE, deadline=deadline)
+        return summary, get_summary_tier()
+    return asyncio.run(run())
+
+
+class TestSummaryTier:
+
+    def test_mock_fallback_is_reported_as_extractive(self, monkeypatch):
+        service, cache = _huggingface_service(monkeypatch)
+        _, tier = _summarize(service)
+        assert tier == "extractive"
+        assert cache.stored == []
+
+    def test_degradations_are_combined(self, monkeypatch):
+        monkeypatch.setattr(summarizer_service, "DEADLINE_FAST_MODEL_BELOW", 60.0)
+        service, _ = _huggingface_service(monkeypatch)
+        _, tier = _summarize(service, Deadline(15.0))
+        assert tier == "fast_model+extractive"
+
+    def test_local_fallback_past_the_deadline_is_not_masked(self, monkeypatch):
+        monkeypatch.setattr(summarizer_service, "DEADLINE_EXTRACTIVE_BELOW", 0.0)
+
+        def slow_pipeline(text, **kwargs):
+            time.sleep(1.0)
+            return [{"summary_text": "late"}]
+
+        service, cache = _huggingface_service(monkeypatch, local_pipeline=slow_pipeline)
+        with pytest.raises(DeadlineExceeded):
+            _summarize(service, Deadline(0.3))
+        assert cache.stored == []
@@ -0,0 +1,18 @@
+from app.services.summary_cache import make_cache_key, normalize_text
+
+
+class TestSummaryCacheKey:
+
+    def test_whitespace_differences_share_a_key(self):
+        a = make_cache_key("Hello   world.\n\nSecond  line.", "openai", "gpt-3.5-turbo", {"max_length": 1500})
+        b = make_cache_key(" Hello world. Second line. ", "openai", "gpt-3.5-turbo", {"max_length": 1500})
+        assert a == b
+
+    def test_provider_model_and_params_change_the_key(self):
+        base = make_cache_key("text", "openai", "gpt-3.5-turbo", {"max_length": 1500})
+        assert base != make_cache_key("text", "huggingface", "gpt-3.5-turbo", {"max_length": 1500})
+        assert base != make_cache_key("text", "openai", "gpt-4", {"max_length": 1500})
+        assert base != make_cache_key("text", "openai", "gpt-3.5-turbo", {"max_length": 500})
+
+    def test_normalize_text_applies_nfkc(self):
+        assert normalize_text("ﬁne print") == "fine print"
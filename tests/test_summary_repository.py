@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.services.summary_repository import (
+    SummaryRepository,
+    AGGREGATE_TOTAL,
+    AGGREGATE_WALLET,
+    AGGREGATE_DOMAIN,
+    AGGREGATE_DAY,
+    AGGREGATE_PROVIDER
+)
+
+SUMMARIES = [
+    ("0xaaa", "https://www.example.com/1", "x" * 100, "openai"),
+    ("0xaaa", "https://example.com/2", "x" * 300, "openai"),
+    ("0xbbb", "https://news.example.org/3", "x" * 200, "huggingface"),
+]
+
+
+def _counters(sessions):
+    async def read():
+        async with sessions() as db:
+            repository = SummaryRepository(db)
+            today = datetime.now(timezone.utc).date().isoformat()
+            counters = {}
+            for dimension, key in [
+                (AGGREGATE_TOTAL, ""),
+                (AGGREGATE_WALLET, "0xaaa"),
+                (AGGREGATE_WALLET, "0xbbb"),
+                (AGGREGATE_DOMAIN, "example.com"),
+                (AGGREGATE_DOMAIN, "news.example.org"),
+                (AGGREGATE_DAY, today),
+            ]:
+                row = await repository.get_usage_aggregate(dimension, key)
+                counters[(dimension, key)] = (row.count, row.total_content_length / row.count)
+            providers = await repository.get_usage_aggregates(AGGREGATE_PROVIDER)
+            return counters, {row.key: row.count for row in providers}
+    return asyncio.run(read())
+
+
+class TestUsageAggregates:
+
+    def _seed(self, sessions):
+        async def seed():
+            async with sessions() as db:
+                repository = SummaryRepository(db)
+                for wallet, url, content, provider in SUMMARIES:
+                    await repository.create_summary(wallet, url, content, "summary", provider=provider)
+        asyncio.run(seed())
+
+    def test_inserts_update_every_dimension(self, sqlite_sessions):
+        self._seed(sqlite_sessions)
+        counters, providers = _counters(sqlite_sessions)
+
+        today = datetime.now(timezone.utc).date().isoformat()
+        assert counters[(AGGREGATE_TOTAL, "")] == (3, 200.0)
+        assert counters[(AGGREGATE_WALLET, "0xaaa")] == (2, 200.0)
+        assert counters[(AGGREGATE_WALLET, "0xbbb")] == (1, 200.0)
+        # www. is stripped, so both example.com URLs land on the same key
+        assert counters[(AGGREGATE_DOMAIN, "example.com")] == (2, 200.0)
+        assert counters[(AGGREGATE_DOMAIN, "news.example.org")] == (1, 200.0)
+        assert counters[(AGGREGATE_DAY, today)] == (3, 200.0)
+        assert providers == {"openai": 2, "huggingface": 1}
+
+    def test_rebuild_reproduces_the_counters(self, sqlite_sessions):
+        self._seed(sqlite_sessions)
+        before, _ = _counters(sqlite_sessions)
+
+        async def rebuild():
+            async with sqlite_sessions() as db:
+                return await SummaryRepository(db).rebuild_usage_aggregates(batch_size=2)
+
+        assert asyncio.run(rebuild()) == 3
+        after, providers = _counters(sqlite_sessions)
+        assert after == before
+        # The provider is not stored on summaries, so history is attributed to "unknown"
+        assert providers == {"unknown": 3}
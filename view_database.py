@@ -1,67 +1,120 @@
 import sqlite3
 import os
+import argparse
 from prettytable import PrettyTable
 
-def view_database():
-    """View the contents of the summarizer database"""
+def _print_rows(columns, rows):
+    # Create pretty table, truncating long text fields
+    pt = PrettyTable()
+    pt.field_names = columns
+    for row in rows:
+        pt.add_row([
+            val[:100] + "..." if isinstance(val, str) and len(val) > 100 else val
+            for val in row
+        ])
+    print(pt)
+
+def view_usage_aggregates(cursor, top=10):
+    """Print the usage aggregates maintained by the API instead of scanning summaries"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='usage_aggregates';")
+    if not cursor.fetchone():
+        print("No usage_aggregates table yet (start the API once to create it)")
+        return
+
+    cursor.execute(
+        "SELECT count, total_content_length FROM usage_aggregates WHERE dimension = 'total' AND key = ''"
+    )
+    total = cursor.fetchone()
+    count, length = total if total else (0, 0)
+    print(f"Total summaries: {count}")
+    print(f"Average content length: {length / count if count else 0:.0f} chars\n")
+
+    for dimension, title in [
+        ("provider", "Providers"),
+        ("domain", "Top domains"),
+        ("wallet", "Top wallets"),
+        ("day", "Recent days"),
+    ]:
+        order = "key DESC" if dimension == "day" else "count DESC"
+        cursor.execute(
+            f"SELECT key, count, CAST(total_content_length AS REAL) / count "
+            f"FROM usage_aggregates WHERE dimension = ? ORDER BY {order} LIMIT ?",
+            (dimension, top)
+        )
+        rows = [(key, n, round(avg or 0)) for key, n, avg in cursor.fetchall()]
+        print(f"{title}:")
+        if rows:
+            _print_rows([dimension, "summaries", "avg content length"], rows)
+        else:
+            print("  (No data)")
+        print()
+
+def view_database(db_path="summarizer.db", rows=5, top=10):
+    """View the schema, latest rows and usage aggregates of the summarizer database"""
     # Connect to the database
-    db_path = "summarizer.db"
     if not os.path.exists(db_path):
         print(f"Database file {db_path} not found!")
         return
-        
+
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
+
     # Get table names
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
     tables = cursor.fetchall()
     print(f"Tables in database: {', '.join(table[0] for table in tables)}\n")
-    
-    # For each table, show its schema and content
+
+    # For each table, show its schema and the latest rows
     for table in tables:
         table_name = table[0]
         print(f"Table: {table_name}")
-        
+
         # Get schema
         cursor.execute(f"PRAGMA table_info({table_name});")
         columns = cursor.fetchall()
         print("Schema:")
         for col in columns:
             print(f"  {col[1]} ({col[2]})")
-        
-        # Get content
-        cursor.execute(f"SELECT * FROM {table_name}")
-        rows = cursor.fetchall()
-        
-        print(f"\nContent ({len(rows)} rows):")
-        if rows:
-            # Create pretty table
-            pt = PrettyTable()
-            pt.field_names = [col[1] for col in columns]
-            
-            # For each row, truncate long text fields
-            formatted_rows = []
-            for row in rows:
-                formatted_row = []
-                for i, val in enumerate(row):
-                    if isinstance(val, str) and len(val) > 100:
-                        formatted_row.append(val[:100] + "...")
-                    else:
-                        formatted_row.append(val)
-                formatted_rows.append(formatted_row)
-                
-            # Add rows to table
-            for row in formatted_rows:
-                pt.add_row(row)
-                
-            print(pt)
-        else:
-            print("  (No data)")
+
+        if rows > 0:
+            # Only read the newest rows; never load the whole table
+            cursor.execute(f"SELECT * FROM {table_name} ORDER BY rowid DESC LIMIT ?", (rows,))
+            latest = cursor.fetchall()
+            print(f"\nLatest {len(latest)} rows:")
+            if latest:
+                _print_rows([col[1] for col in columns], latest)
+            else:
+                print("  (No data)")
         print("\n" + "-"*80 + "\n")
-    
+
+    view_usage_aggregates(cursor, top)
     conn.close()
 
+def rebuild_usage_aggregates():
+    """Recompute the usage aggregates from the summaries table (one-off full scan)"""
+    import asyncio
+    from app.database import SessionLocal
+    from app.services.summary_repository import SummaryRepository
+
+    async def _rebuild():
+        async with SessionLocal() as db:
+            return await SummaryRepository(db).rebuild_usage_aggregates()
+
+    print(f"Rebuilt usage aggregates from {asyncio.run(_rebuild())} summaries")
+
+def backfill_article_fingerprints(provider, model):
+    """Fingerprint existing summaries for near-duplicate detection (one-off full scan)"""
+    import asyncio
+    from app.database import SessionLocal
+    from app.services.summary_cache import SUMMARY_CACHE_VERSION
+    from app.services.summary_repository import SummaryRepository
+
+    async def _backfill():
+        async with SessionLocal() as db:
+            return await SummaryRepository(db).backfill_article_fingerprints(provider, model, SUMMARY_CACHE_VERSION)
+
+    print(f"Added {asyncio.run(_backfill())} article fingerprints")
+
 if __name__ == "__main__":
     # Install prettytable if needed
     try:
@@ -70,5 +123,20 @@ if __name__ == "__main__":
         print("Installing prettytable...")
         import subprocess
         subprocess.check_call(["pip", "install", "prettytable"])
-        
-    view_database()
+
+    parser = argparse.ArgumentParser(description="View the summarizer database")
+    parser.add_argument("--db", default="summarizer.db", help="Path to the SQLite database")
+    parser.add_argument("--rows", type=int, default=5, help="Latest rows to show per table (0 to hide)")
+    parser.add_argument("--top", type=int, default=10, help="Entries to show per aggregate dimension")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recompute usage aggregates from existing summaries (DATABASE_URL) first")
+    parser.add_argument("--fingerprints", nargs=2, metavar=("PROVIDER", "MODEL"),
+                        help="Fingerprint existing summaries for near-duplicate detection (DATABASE_URL) first, "
+                             "attributing them to the provider and model that produced them")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_usage_aggregates()
+    if args.fingerprints:
+        backfill_article_fingerprints(*args.fingerprints)
+    view_database(args.db, args.rows, args.top)